@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import os
 from jose import JWTError, jwt
@@ -9,6 +9,7 @@ from fastapi import Request
 
 from database import get_db
 from models import User
+from services.user_cache import user_cache
 
 # For now, we'll use a simple token-based auth
 # Later we'll implement proper OAuth2 with Google
@@ -17,6 +18,8 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "dev_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 1 week
+# Trust the user claims in a valid token instead of loading the user
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "false").lower() == "true"
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -30,7 +33,7 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,12 +42,22 @@ async def get_current_user(
     )
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: int = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        user_id = int(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        # A missing or non-numeric sub is as invalid as a bad signature
         raise credentials_exception
-    user = db.query(User).filter(User.id == user_id).first()
+
+    if AUTH_STATELESS:
+        # The signature vouches for the claims, so don't look the user up.
+        # A deleted user's token stays valid until it expires.
+        return User(id=user_id, email=payload.get("email"), name=payload.get("name"))
+
+    # Cached users are transient copies: read their columns, but don't attach
+    # them to a session or follow their relationships
+    user = user_cache.get(user_id)
     if user is None:
-        raise credentials_exception
+        user = await db.get(User, user_id)
+        if user is None:
+            raise credentials_exception
+        user_cache.set(user)
     return user 
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Compare the interval availability engine against the original nested loop.
+
+Run from the backend directory:
+
+    python -m benchmarks.availability_bench
+"""
+import random
+import timeit
+from datetime import date, datetime, timedelta, timezone
+
+from services import availability
+
+EVENT_COUNTS = [10, 100, 10_000]
+DAYS = 7
+MEETING_LENGTH = 30
+WINDOWS = [(day, "09:00", "17:00") for day in range(5)]
+
+
+def make_events(count: int, start_date: date, seed: int = 0) -> list:
+    """Generate Google-style events spread across the range, ordered by start time like the API returns them."""
+    rng = random.Random(seed)
+    range_start = datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc)
+    starts = sorted(rng.randrange(0, (DAYS + 1) * 24 * 60, 15) for _ in range(count))
+    events = []
+    for offset in starts:
+        start = range_start + timedelta(minutes=offset)
+        end = start + timedelta(minutes=rng.choice([15, 30, 45, 60, 90]))
+        events.append({
+            "start": {"dateTime": start.isoformat().replace("+00:00", "Z")},
+            "end": {"dateTime": end.isoformat().replace("+00:00", "Z")},
+        })
+    return events
+
+
+def legacy_slots(windows, events, start_date, end_date, meeting_length):
+    """The original get_available_slots loop, with tz-aware slot times so it can run."""
+    available_slots = {}
+    current_date = start_date
+    while current_date <= end_date:
+        day_windows = [w for w in windows if w[0] == current_date.weekday()]
+        if day_windows:
+            slots = []
+            for _, start_hour, end_hour in day_windows:
+                start_time = datetime.strptime(start_hour, "%H:%M").time()
+                end_time = datetime.strptime(end_hour, "%H:%M").time()
+
+                current_time = start_time
+                while current_time < end_time:
+                    slot_start = datetime.combine(current_date, current_time, tzinfo=timezone.utc)
+                    slot_end = slot_start + timedelta(minutes=meeting_length)
+
+                    slot_available = True
+                    for event in events:
+                        event_start = event['start'].get('dateTime', event['start'].get('date'))
+                        event_end = event['end'].get('dateTime', event['end'].get('date'))
+
+                        if isinstance(event_start, str):
+                            event_start = datetime.fromisoformat(event_start.replace('Z', '+00:00'))
+                        if isinstance(event_end, str):
+                            event_end = datetime.fromisoformat(event_end.replace('Z', '+00:00'))
+
+                        if (slot_start < event_end and slot_end > event_start):
+                            slot_available = False
+                            break
+
+                    if slot_available:
+                        slots.append(current_time.strftime("%H:%M"))
+
+                    current_time = (datetime.combine(current_date, current_time) +
+                                    timedelta(minutes=meeting_length)).time()
+
+            if slots:
+                available_slots[current_date.isoformat()] = slots
+
+        current_date += timedelta(days=1)
+
+    return available_slots
+
+
+def interval_slots(windows, events, start_date, end_date, meeting_length):
+    window_ranges = availability.window_intervals(windows, start_date, end_date)
+    busy = availability.event_intervals(events)
+    slots = availability.free_slots(window_ranges, busy, meeting_length)
+    return availability.group_slots_by_date(slots)
+
+
+def main():
+    start_date = date(2025, 6, 2)
+    end_date = start_date + timedelta(days=DAYS)
+    print(f"{'events':>8} {'legacy (ms)':>12} {'interval (ms)':>14} {'speedup':>9}")
+    for count in EVENT_COUNTS:
+        events = make_events(count, start_date)
+        args = (WINDOWS, events, start_date, end_date, MEETING_LENGTH)
+        assert legacy_slots(*args) == interval_slots(*args)
+
+        runs = 1 if count >= 10_000 else 10
+        legacy = min(timeit.repeat(lambda: legacy_slots(*args), number=runs, repeat=3)) / runs
+        interval = min(timeit.repeat(lambda: interval_slots(*args), number=runs, repeat=3)) / runs
+        print(f"{count:>8} {legacy * 1000:>12.2f} {interval * 1000:>14.2f} {legacy / interval:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare per-link pure Python slot generation with the NumPy bulk generator.
+
+Run from the backend directory:
+
+    python -m benchmarks.bulk_availability_bench
+"""
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from services import availability, bulk_availability
+from services.weekly_template import compile_template, expand_template
+
+WINDOWS = [(day, "09:00", "17:00") for day in range(5)] + [(5, "10:00", "13:00")]
+LINK_COUNTS = [1, 10, 50]
+HORIZON_DAYS = [30, 180]  # 180 days crosses a DST transition
+ZONE = ZoneInfo("America/New_York")
+
+
+def make_links(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [
+        (link_id, rng.choice([15, 30, 45, 60]), rng.choice([0, 5, 10]), rng.choice([0, 5, 10]))
+        for link_id in range(count)
+    ]
+
+
+def make_busy(start: int, days: int, seed: int = 0):
+    rng = random.Random(seed)
+    intervals = []
+    for _ in range(days * 6):
+        busy_start = start + rng.randrange(0, days * 24 * 60, 15)
+        intervals.append((busy_start, busy_start + rng.choice([30, 60, 90])))
+    return availability.merge_intervals(intervals)
+
+
+def python_slots(windows, busy, links):
+    return {
+        link_id: availability.group_slots_by_date(
+            availability.free_slots(windows, busy, meeting_length, buffer_before, buffer_after),
+            ZONE
+        )
+        for link_id, meeting_length, buffer_before, buffer_after in links
+    }
+
+
+def numpy_slots(windows, busy, links):
+    slots = bulk_availability.bulk_free_slots(
+        bulk_availability.to_array(windows),
+        bulk_availability.to_array(busy),
+        links
+    )
+    offsets = bulk_availability.OffsetTable(ZONE, windows[0][0], windows[-1][1])
+    return {link_id: bulk_availability.format_slots(starts, offsets) for link_id, starts in slots.items()}
+
+
+def main():
+    start = availability.to_minutes(datetime(2025, 6, 2, tzinfo=timezone.utc))
+    template = compile_template(WINDOWS)
+    print(f"{'links':>6} {'days':>5} {'python (ms)':>12} {'numpy (ms)':>11} {'speedup':>9}")
+    for days in HORIZON_DAYS:
+        end = start + days * 24 * 60
+        windows = expand_template(template, start, end)
+        busy = make_busy(start, days)
+        for count in LINK_COUNTS:
+            links = make_links(count)
+            assert python_slots(windows, busy, links) == numpy_slots(windows, busy, links)
+
+            python = min(timeit.repeat(lambda: python_slots(windows, busy, links), number=3, repeat=3)) / 3
+            vectorized = min(timeit.repeat(lambda: numpy_slots(windows, busy, links), number=3, repeat=3)) / 3
+            print(f"{count:>6} {days:>5} {python * 1000:>12.2f} {vectorized * 1000:>11.2f} {python / vectorized:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
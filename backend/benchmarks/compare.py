@@ -0,0 +1,55 @@
+"""Compare two saved benchmark results and fail on regressions.
+
+Reads the load results ``benchmarks/locustfile.py`` writes and the JSON
+pytest-benchmark writes (``--benchmark-json`` or ``--benchmark-autosave``).
+A load endpoint regresses when its p95 latency grows or its throughput
+drops by more than the threshold; a microbenchmark when its median grows:
+
+    python -m benchmarks.compare benchmarks/results/load-A.json benchmarks/results/load-B.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+from typing import Dict, Tuple
+
+# metric -> whether higher is better
+LOAD_METRICS = {"p95_ms": False, "rps": True}
+MICRO_METRICS = {"median": False}
+
+
+def load(path: str) -> Tuple[Dict[str, Dict[str, float]], Dict[str, bool]]:
+    with open(path) as f:
+        results = json.load(f)
+    if results.get("kind") == "load":
+        return results["results"], LOAD_METRICS
+    # pytest-benchmark
+    return {bench["fullname"]: bench["stats"] for bench in results["benchmarks"]}, MICRO_METRICS
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative change, e.g. 0.1 for 10%%")
+    args = parser.parse_args()
+
+    baseline, metrics = load(args.baseline)
+    candidate, _ = load(args.candidate)
+    regressions = 0
+    print(f"{'benchmark':<60} {'metric':>8} {'baseline':>12} {'candidate':>12} {'change':>8}")
+    for name in sorted(baseline.keys() & candidate.keys()):
+        for metric, higher_is_better in metrics.items():
+            old, new = baseline[name].get(metric), candidate[name].get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = -change > args.threshold if higher_is_better else change > args.threshold
+            regressions += regressed
+            print(f"{name[-60:]:<60} {metric:>8} {old:>12.4g} {new:>12.4g} {change:>+7.1%}{'  REGRESSED' if regressed else ''}")
+    for name in sorted(baseline.keys() ^ candidate.keys()):
+        print(f"{name[-60:]:<60} only in {'baseline' if name in baseline else 'candidate'}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""Seeded generators of realistic scheduling data for benchmarks.
+
+Everything is deterministic for a given seed, so two runs compare like with
+like. The ``make_*`` functions return unsaved model objects or plain data;
+``seed_database`` writes a whole dataset to a scratch database and
+``fake_calendars`` builds the matching Google calendars for
+``benchmarks.fake_google.install``.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.fake_google import FakeCalendarService
+from models import CALENDAR_EVENTS_SCOPE, CustomQuestion, GoogleCalendar, Meeting, SchedulingLink, SchedulingWindow, User
+from services.availability import Interval, merge_intervals, to_minutes
+
+FIRST_NAMES = ["Ada", "Grace", "Alan", "Edsger", "Barbara", "Donald", "Frances", "Ken", "Radia", "Tim"]
+LAST_NAMES = ["Lovelace", "Hopper", "Turing", "Dijkstra", "Liskov", "Knuth", "Allen", "Thompson", "Perlman", "Berners-Lee"]
+LINK_TITLES = ["Intro call", "Portfolio review", "Quarterly check-in", "Onboarding", "Tax planning", "Retirement planning", "Follow-up"]
+QUESTIONS = [
+    "What would you like to discuss?",
+    "What is your company name?",
+    "How did you hear about us?",
+    "What is your investable asset range?",
+    "Anything we should prepare in advance?",
+]
+MEETING_LENGTHS = [15, 30, 30, 30, 45, 60, 60, 90]
+# Weekly availability patterns as (days, [(start, end), ...])
+WINDOW_PATTERNS = [
+    (range(5), [("09:00", "17:00")]),
+    (range(5), [("09:00", "12:00"), ("13:00", "17:00")]),
+    (range(4), [("08:00", "16:00")]),
+    (range(6), [("10:00", "18:30")]),
+    ((0, 2, 4), [("09:30", "12:00"), ("14:00", "19:00")]),
+]
+EVENT_LENGTHS = [15, 30, 30, 45, 60, 60, 90, 120]
+
+
+def make_user(index: int, rng: random.Random) -> User:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return User(email=f"{first}.{last}.{index}@example.com".lower(), name=f"{first} {last}")
+
+
+def make_windows(rng: random.Random) -> List[SchedulingWindow]:
+    days, hours = rng.choice(WINDOW_PATTERNS)
+    return [
+        SchedulingWindow(day_of_week=day, start_hour=start, end_hour=end)
+        for day in days for start, end in hours
+    ]
+
+
+def make_links(user_index: int, count: int, rng: random.Random) -> List[SchedulingLink]:
+    links = []
+    for i in range(count):
+        title = LINK_TITLES[i % len(LINK_TITLES)]
+        link = SchedulingLink(
+            title=title,
+            slug=f"{title.lower().replace(' ', '-')}-{user_index}-{i}",
+            meeting_length=rng.choice(MEETING_LENGTHS),
+            buffer_before=rng.choice([0, 0, 5, 10]),
+            buffer_after=rng.choice([0, 5, 10, 15])
+        )
+        link.custom_questions = [
+            CustomQuestion(question=question, required=rng.random() < 0.4)
+            for question in rng.sample(QUESTIONS, rng.randint(0, len(QUESTIONS)))
+        ]
+        links.append(link)
+    return links
+
+
+def business_starts(windows: List[SchedulingWindow], first_day: date, days: int, step: int = 15) -> List[datetime]:
+    """Every ``step``-minute start inside the windows over ``days`` days, in UTC."""
+    by_day: Dict[int, List[Tuple[str, str]]] = {}
+    for window in windows:
+        by_day.setdefault(window.day_of_week, []).append((window.start_hour, window.end_hour))
+    starts = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        for start_hour, end_hour in by_day.get(day.weekday(), []):
+            start = datetime.combine(day, time.fromisoformat(start_hour), tzinfo=timezone.utc)
+            end = datetime.combine(day, time.fromisoformat(end_hour), tzinfo=timezone.utc)
+            while start < end:
+                starts.append(start)
+                start += timedelta(minutes=step)
+    return starts
+
+
+def make_meetings(
+    links: List[SchedulingLink],
+    windows: List[SchedulingWindow],
+    count: int,
+    first_day: date,
+    days: int,
+    rng: random.Random
+) -> List[Meeting]:
+    """Up to ``count`` bookings in the windows, none overlapping, as meetings_no_overlap requires.
+
+    Answers are keyed by question id like a booking's, so the links' questions need ids.
+    """
+    # Starts and lengths are whole quarter hours, so track booked quarters
+    booked = set()
+    meetings = []
+    candidates = business_starts(windows, first_day, days)
+    rng.shuffle(candidates)
+    for start in candidates:
+        if len(meetings) >= count:
+            break
+        link = rng.choice(links)
+        end = start + timedelta(minutes=link.meeting_length)
+        quarters = range(to_minutes(start) // 15, -(-to_minutes(end) // 15))
+        if any(quarter in booked for quarter in quarters):
+            continue
+        booked.update(quarters)
+        meetings.append(Meeting(
+            scheduling_link=link,
+            email=f"invitee{len(meetings)}@example.org",
+            linkedin_url=f"https://www.linkedin.com/in/invitee{len(meetings)}",
+            meeting_time=start,
+            end_time=end,
+            answers={str(question.id): "Synthetic answer" for question in link.custom_questions}
+        ))
+    return meetings
+
+
+def make_events(count: int, first_day: date, days: int, rng: random.Random) -> List[Tuple[datetime, datetime, bool]]:
+    """(start, end, transparent) for Google events, mostly in working hours."""
+    events = []
+    for _ in range(count):
+        day = first_day + timedelta(days=rng.randrange(days))
+        if rng.random() < 0.85:
+            minute = rng.randrange(8 * 60, 18 * 60, 15)
+        else:
+            minute = rng.randrange(0, 24 * 60, 15)
+        start = datetime.combine(day, time.min, tzinfo=timezone.utc) + timedelta(minutes=minute)
+        events.append((start, start + timedelta(minutes=rng.choice(EVENT_LENGTHS)), rng.random() < 0.1))
+    events.sort()
+    return events
+
+
+def busy_intervals(events: List[Tuple[datetime, datetime, bool]]) -> List[Interval]:
+    return merge_intervals((to_minutes(start), to_minutes(end)) for start, end, transparent in events if not transparent)
+
+
+@dataclass
+class Dataset:
+    users: int = 20
+    links_per_user: int = 3
+    meetings_per_user: int = 200
+    events_per_calendar: int = 400
+    days: int = 90
+    first_day: Optional[date] = None
+    seed: int = 0
+
+    def start(self) -> date:
+        return self.first_day or datetime.now(timezone.utc).date()
+
+
+def seed_database(engine, dataset: Dataset) -> Dict[str, List]:
+    """Drop and recreate every table in ``engine``'s database and fill it.
+
+    Returns the links (id, slug and question ids) and calendar ids, for load
+    scenarios and ``fake_calendars``.
+    """
+    from sqlalchemy.orm import Session
+    from models import Base
+
+    rng = random.Random(dataset.seed)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        users = []
+        for index in range(dataset.users):
+            user = make_user(index, rng)
+            windows = make_windows(rng)
+            links = make_links(index, dataset.links_per_user, rng)
+            user.scheduling_windows = windows
+            user.scheduling_links = links
+            user.google_calendars = [GoogleCalendar(
+                email=user.email,
+                access_token="fake-access-token",
+                refresh_token=f"fake-refresh-token-{index}",
+                token_uri="https://oauth2.googleapis.com/token",
+                client_id="fake-client-id",
+                client_secret="fake-client-secret",
+                scopes=["https://www.googleapis.com/auth/calendar.readonly", CALENDAR_EVENTS_SCOPE],
+                # Far from expiry, so the credential refresher leaves it alone
+                token_expires_at=datetime.now(timezone.utc) + timedelta(days=365)
+            )]
+            users.append(user)
+        db.add_all(users)
+        db.flush()
+        for user in users:
+            user.meetings = make_meetings(
+                user.scheduling_links, user.scheduling_windows,
+                dataset.meetings_per_user, dataset.start(), dataset.days, rng
+            )
+        db.commit()
+        return {
+            "links": [
+                {"id": link.id, "slug": link.slug, "question_ids": [question.id for question in link.custom_questions]}
+                for user in users for link in user.scheduling_links
+            ],
+            "calendar_ids": [calendar.id for user in users for calendar in user.google_calendars],
+        }
+
+
+def fake_calendars(calendar_ids: List[int], dataset: Dataset) -> Dict[int, FakeCalendarService]:
+    calendars = {}
+    for calendar_id in calendar_ids:
+        service = FakeCalendarService()
+        rng = random.Random(dataset.seed * 100_003 + calendar_id)
+        for start, end, transparent in make_events(dataset.events_per_calendar, dataset.start(), dataset.days, rng):
+            service.add_event(start, end, transparent=transparent)
+        calendars[calendar_id] = service
+    return calendars
@@ -0,0 +1,148 @@
+"""In-memory stand-in for the parts of the Calendar API the backend uses.
+
+``FakeCalendarService`` mimics ``service.events().list(...).execute()``,
+including paging and ``syncToken`` deltas, and
+``service.freebusy().query(...).execute()``, so sync and availability code
+can run without network access. ``install()`` routes the backend's pooled
+Google clients to a set of fakes.
+"""
+import itertools
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+def _rfc3339(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class _Request:
+    def __init__(self, result):
+        self._result = result
+
+    def execute(self):
+        return self._result()
+
+
+class FakeCalendarService:
+    def __init__(self, page_size: int = 250):
+        self.page_size = page_size
+        self.events_by_id: Dict[str, dict] = {}
+        self._changes: List[str] = []  # event ids in change order
+        self._ids = itertools.count(1)
+        self._expired_tokens = set()
+        self.calls = 0
+        self.items_returned = 0
+
+    # Mutations -----------------------------------------------------------
+
+    def add_event(self, start: datetime, end: datetime, transparent: bool = False) -> str:
+        event_id = f"evt{next(self._ids)}"
+        event = {
+            "id": event_id,
+            "status": "confirmed",
+            "start": {"dateTime": _rfc3339(start)},
+            "end": {"dateTime": _rfc3339(end)},
+        }
+        if transparent:
+            event["transparency"] = "transparent"
+        self.events_by_id[event_id] = event
+        self._changes.append(event_id)
+        return event_id
+
+    def move_event(self, event_id: str, delta: timedelta) -> None:
+        event = self.events_by_id[event_id]
+        for field in ("start", "end"):
+            moved = datetime.fromisoformat(event[field]["dateTime"].replace("Z", "+00:00")) + delta
+            event[field] = {"dateTime": _rfc3339(moved)}
+        self._changes.append(event_id)
+
+    def cancel_event(self, event_id: str) -> None:
+        self.events_by_id[event_id]["status"] = "cancelled"
+        self._changes.append(event_id)
+
+    def expire_sync_tokens(self) -> None:
+        """Make every token issued so far fail with 410 Gone, like Google does."""
+        self._expired_tokens.update(str(i) for i in range(len(self._changes) + 1))
+
+    # API surface ---------------------------------------------------------
+
+    def events(self):
+        return self
+
+    def list(
+        self,
+        calendarId: str = "primary",
+        syncToken: Optional[str] = None,
+        pageToken: Optional[str] = None,
+        timeMin: Optional[str] = None,
+        timeMax: Optional[str] = None,
+        maxResults: Optional[int] = None,
+        **kwargs
+    ):
+        def result():
+            self.calls += 1
+            if syncToken is not None:
+                if syncToken in self._expired_tokens:
+                    raise HttpError(httplib2.Response({"status": 410}), b"Sync token is no longer valid")
+                changed = dict.fromkeys(self._changes[int(syncToken):])
+                items = [self.events_by_id[event_id] for event_id in changed]
+            else:
+                items = [
+                    event for event in self.events_by_id.values()
+                    if event["status"] != "cancelled"
+                    and (timeMin is None or event["end"]["dateTime"] > timeMin)
+                    and (timeMax is None or event["start"]["dateTime"] < timeMax)
+                ]
+                items.sort(key=lambda event: event["start"]["dateTime"])
+
+            size = min(maxResults or self.page_size, self.page_size)
+            offset = int(pageToken or 0)
+            # Copies, so later mutations don't rewrite responses already returned
+            page = [dict(event) for event in items[offset:offset + size]]
+            self.items_returned += len(page)
+            response = {"items": page}
+            if offset + size < len(items):
+                response["nextPageToken"] = str(offset + size)
+            else:
+                response["nextSyncToken"] = str(len(self._changes))
+            return response
+
+        return _Request(result)
+
+    def freebusy(self):
+        return _FreeBusy(self)
+
+
+class _FreeBusy:
+    def __init__(self, service: FakeCalendarService):
+        self._service = service
+
+    def query(self, body: dict):
+        def result():
+            self._service.calls += 1
+            busy = [
+                {"start": event["start"]["dateTime"], "end": event["end"]["dateTime"]}
+                for event in sorted(self._service.events_by_id.values(), key=lambda event: event["start"]["dateTime"])
+                if event["status"] != "cancelled"
+                and event.get("transparency") != "transparent"
+                and event["end"]["dateTime"] > body["timeMin"]
+                and event["start"]["dateTime"] < body["timeMax"]
+            ]
+            return {"calendars": {item["id"]: {"busy": busy} for item in body.get("items", [])}}
+
+        return _Request(result)
+
+
+def install(calendars: Dict[int, FakeCalendarService]) -> None:
+    """Answer the backend's Calendar API calls from ``calendars``, keyed by GoogleCalendar id."""
+    from services.google_client import google_clients
+
+    @contextmanager
+    def service(api, version, credentials, key=None):
+        yield calendars[key]
+
+    google_clients.service = service
@@ -0,0 +1,74 @@
+"""Local stand-ins for the external services the job handlers call.
+
+Each fake matches the client interface in ``services.side_effects`` and can
+fail a fraction of calls with a transient error, to exercise retries. Use
+``install()`` to point the handlers at a set of fakes.
+"""
+import random
+from email.message import EmailMessage
+from typing import Dict, List
+
+from services import side_effects
+
+
+class TransientError(ConnectionError):
+    """Stands in for a timeout or 5xx from the real service."""
+
+
+class _Flaky:
+    def __init__(self, failure_rate: float = 0.0, seed: int = 0):
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+        self.failures = 0
+
+    def _maybe_fail(self) -> None:
+        self.calls += 1
+        if self._rng.random() < self.failure_rate:
+            self.failures += 1
+            raise TransientError("injected failure")
+
+
+class FakeCalendarEvents(_Flaky):
+    def __init__(self, failure_rate: float = 0.0, seed: int = 0):
+        super().__init__(failure_rate, seed)
+        self.events: Dict[str, dict] = {}
+
+    def insert(self, calendar, event: dict) -> None:
+        self._maybe_fail()
+        # Google answers 409 for a duplicate id, which the client treats as created
+        self.events.setdefault(event["id"], event)
+
+
+class FakeMailer(_Flaky):
+    def __init__(self, failure_rate: float = 0.0, seed: int = 0):
+        super().__init__(failure_rate, seed)
+        self.sent: List[EmailMessage] = []
+
+    def send(self, message: EmailMessage) -> None:
+        self._maybe_fail()
+        self.sent.append(message)
+
+    def unique_messages(self) -> int:
+        return len({message["Message-ID"] for message in self.sent})
+
+
+class FakeCRM(_Flaky):
+    def __init__(self, failure_rate: float = 0.0, seed: int = 0):
+        super().__init__(failure_rate, seed)
+        self.contacts: Dict[str, dict] = {}
+
+    def create(self, properties: dict) -> None:
+        self._maybe_fail()
+        # HubSpot answers 409 for an existing email, which the client treats as created
+        self.contacts.setdefault(properties["email"], properties)
+
+
+def install(failure_rate: float = 0.0, seed: int = 0) -> side_effects.Clients:
+    fakes = side_effects.Clients(
+        calendar=FakeCalendarEvents(failure_rate, seed),
+        mailer=FakeMailer(failure_rate, seed + 1),
+        crm=FakeCRM(failure_rate, seed + 2)
+    )
+    side_effects.clients = fakes
+    return fakes
@@ -0,0 +1,77 @@
+"""Measure request throughput against a running API server.
+
+Start the server with a fixed worker count, then run from the backend
+directory:
+
+    uvicorn main:app --workers 1 --port 8000
+    python -m benchmarks.load_bench --url http://localhost:8000 --concurrency 50
+
+Run it once on the old sync build and once on this one, with the same
+worker count and concurrency, to compare requests per second.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+DEFAULT_PATHS = ["/api/scheduling-windows/", "/api/scheduling-links/"]
+
+
+async def worker(client: httpx.AsyncClient, paths, deadline: float, latencies, failures):
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 500:
+                failures.append(response.status_code)
+                continue
+        except httpx.HTTPError as e:
+            failures.append(type(e).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def run(url: str, paths, concurrency: int, duration: float, headers):
+    latencies, failures = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, headers=headers, limits=limits, timeout=30) as client:
+        # Warm up the server's pools before measuring
+        await asyncio.gather(*(client.get(path) for path in paths))
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            worker(client, paths, deadline, latencies, failures) for _ in range(concurrency)
+        ))
+    return latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--token", help="Bearer token for authenticated endpoints")
+    args = parser.parse_args()
+
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    latencies, failures = asyncio.run(
+        run(args.url, args.paths or DEFAULT_PATHS, args.concurrency, args.duration, headers)
+    )
+    if not latencies:
+        print(f"No successful requests ({len(failures)} failures)")
+        return
+
+    latencies.sort()
+    print(f"requests:    {len(latencies)} ok, {len(failures)} failed")
+    print(f"throughput:  {len(latencies) / args.duration:.1f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latency p99: {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
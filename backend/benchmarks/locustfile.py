@@ -0,0 +1,107 @@
+"""HTTP load scenario for the public booking flow.
+
+Invitees open a link by slug, page through its available slots, and now and
+then book one. Links come from the dataset file ``benchmarks.serve``
+writes. Start the server, then from the backend directory:
+
+    locust -f benchmarks/locustfile.py --host http://127.0.0.1:8000 \\
+        --headless --users 50 --spawn-rate 10 --run-time 2m
+
+Each run's per-endpoint latency percentiles and throughput are saved to
+``BENCH_RESULTS_DIR/load-<timestamp>.json``; compare two runs with
+``python -m benchmarks.compare``.
+"""
+import json
+import os
+import random
+import time
+from datetime import date, datetime, time as clock, timedelta
+from zoneinfo import ZoneInfo
+
+from locust import HttpUser, between, events, task
+
+RESULTS_DIR = os.getenv("BENCH_RESULTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "results"))
+DATASET_FILE = os.getenv("BENCH_DATASET", os.path.join(RESULTS_DIR, "dataset.json"))
+TIMEZONES = ["UTC", "America/New_York", "America/Los_Angeles", "Europe/London", "Asia/Tokyo"]
+PERCENTILES = (0.5, 0.95, 0.99)
+
+with open(DATASET_FILE) as f:
+    LINKS = json.load(f)["links"]
+
+
+class Invitee(HttpUser):
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        self.link = random.choice(LINKS)
+        self.zone = ZoneInfo(random.choice(TIMEZONES))
+        self.slots = []
+
+    @task(3)
+    def open_link(self):
+        self.link = random.choice(LINKS)
+        self.client.get(f"/api/scheduling-links/{self.link['slug']}", name="/api/scheduling-links/[slug]")
+
+    @task(6)
+    def browse_slots(self):
+        start = datetime.now(self.zone).date() + timedelta(days=random.choice([0, 0, 7, 14]))
+        with self.client.get(
+            f"/api/scheduling-links/{self.link['id']}/available-slots",
+            params={"tz": self.zone.key, "start_date": start.isoformat(), "days": 7},
+            name="/api/scheduling-links/[id]/available-slots",
+            catch_response=True
+        ) as response:
+            if response.status_code == 200:
+                # Slots are local dates and times in the requested zone
+                self.slots = [
+                    datetime.combine(date.fromisoformat(day), clock.fromisoformat(slot), tzinfo=self.zone).isoformat()
+                    for day, times in response.json().items() for slot in times
+                ]
+                response.success()
+
+    @task(1)
+    def book(self):
+        if not self.slots:
+            return
+        with self.client.post(
+            f"/api/scheduling-links/{self.link['slug']}/book",
+            json={
+                "email": f"load{random.randrange(10 ** 9)}@example.org",
+                "linkedin_url": "https://www.linkedin.com/in/load-test",
+                "answers": {str(question_id): "Load test" for question_id in self.link["question_ids"]},
+                "meeting_time": random.choice(self.slots),
+            },
+            name="/api/scheduling-links/[slug]/book",
+            catch_response=True
+        ) as response:
+            # Losing a race for a slot is the expected outcome, not an error
+            if response.status_code in (201, 409):
+                response.success()
+        self.slots = []
+
+
+@events.quitting.add_listener
+def save_results(environment, **kwargs):
+    stats = environment.stats
+    entries = list(stats.entries.values()) + [stats.total]
+    results = {
+        "kind": "load",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        # The runner has stopped every user by now, so report the requested count
+        "users": getattr(environment.parsed_options, "num_users", None),
+        "results": {
+            f"{entry.method or ''} {entry.name}".strip(): {
+                "requests": entry.num_requests,
+                "failures": entry.num_failures,
+                "rps": entry.total_rps,
+                "mean_ms": entry.avg_response_time,
+                **{f"p{int(p * 100)}_ms": entry.get_response_time_percentile(p) for p in PERCENTILES},
+            }
+            for entry in entries
+        },
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"load-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Load results written to {path}")
@@ -0,0 +1,124 @@
+"""pytest-benchmark microbenchmarks of slot generation and serialization.
+
+Inputs come from ``benchmarks.data``, so they are the same on every run.
+Run from the backend directory, saving results as JSON under
+``benchmarks/results`` and comparing against the previous saved run:
+
+    pip install -r benchmarks/requirements.txt
+    pytest benchmarks/micro_bench.py --benchmark-autosave --benchmark-storage=benchmarks/results/micro
+    pytest benchmarks/micro_bench.py --benchmark-storage=benchmarks/results/micro \\
+        --benchmark-compare --benchmark-compare-fail=median:10%
+
+``--benchmark-json=<file>`` writes a single run's results instead.
+"""
+import json
+import random
+from datetime import date, datetime, time, timezone
+from typing import List
+from zoneinfo import ZoneInfo
+
+import pytest
+from pydantic import TypeAdapter
+
+from benchmarks import data
+from schemas.meeting import MeetingResponse
+from schemas.scheduling_link import SchedulingLinkResponse
+from services import availability, bulk_availability
+from services.weekly_template import compile_template, expand_template
+
+FIRST_DAY = date(2030, 1, 7)
+ZONE = ZoneInfo("America/New_York")
+WINDOWS = [(day, "09:00", "12:00") for day in range(5)] + [(day, "13:00", "17:00") for day in range(5)]
+
+
+def horizon(days: int):
+    start = availability.to_minutes(datetime.combine(FIRST_DAY, time.min, tzinfo=timezone.utc))
+    return start, start + days * availability.MINUTES_PER_DAY
+
+
+def busy(days: int, events_per_day: int):
+    rng = random.Random(days * 1000 + events_per_day)
+    return data.busy_intervals(data.make_events(days * events_per_day, FIRST_DAY, days, rng))
+
+
+def with_ids(links):
+    """Fill in what the database would, so response schemas validate."""
+    created = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    question_ids = iter(range(1, 1_000_000))
+    for link_id, link in enumerate(links, 1):
+        link.id, link.user_id, link.created_at = link_id, 1, created
+        for question in link.custom_questions:
+            question.id, question.scheduling_link_id, question.created_at = next(question_ids), link_id, created
+    return links
+
+
+@pytest.mark.parametrize("days", [7, 30, 90])
+def test_expand_template(benchmark, days):
+    template = compile_template(WINDOWS)
+    start, end = horizon(days)
+    benchmark(expand_template, template, start, end)
+
+
+@pytest.mark.parametrize("days,events_per_day", [(7, 5), (30, 5), (90, 20)])
+def test_free_slots(benchmark, days, events_per_day):
+    start, end = horizon(days)
+    windows = expand_template(compile_template(WINDOWS), start, end)
+    busy_time = busy(days, events_per_day)
+    benchmark(availability.free_slots, windows, busy_time, 30, buffer_before=5, buffer_after=10)
+
+
+@pytest.mark.parametrize("zone", [None, ZONE], ids=["utc", "new_york"])
+def test_group_slots_by_date(benchmark, zone):
+    start, end = horizon(30)
+    slots = availability.free_slots(expand_template(compile_template(WINDOWS), start, end), busy(30, 5), 15)
+    benchmark(availability.group_slots_by_date, slots, zone)
+
+
+@pytest.mark.parametrize("links", [1, 10, 50])
+def test_bulk_free_slots(benchmark, links):
+    start, end = horizon(30)
+    windows = bulk_availability.to_array(expand_template(compile_template(WINDOWS), start, end))
+    busy_time = bulk_availability.to_array(busy(30, 5))
+    rng = random.Random(links)
+    specs = [(i, rng.choice(data.MEETING_LENGTHS), rng.choice([0, 5]), rng.choice([0, 10])) for i in range(links)]
+    offsets = bulk_availability.OffsetTable(ZONE, start, end)
+
+    def run():
+        slots = bulk_availability.bulk_free_slots(windows, busy_time, specs)
+        return {key: bulk_availability.format_slots(starts, offsets) for key, starts in slots.items()}
+
+    benchmark(run)
+
+
+def test_available_slots_body(benchmark):
+    """What get_available_slots does per request once busy time is cached: slots, grouping and JSON."""
+    start, end = horizon(30)
+    template = compile_template(WINDOWS)
+    busy_time = busy(30, 5)
+
+    def run():
+        slots = availability.free_slots(expand_template(template, start, end), busy_time, 30, buffer_before=5, buffer_after=10)
+        return json.dumps(availability.group_slots_by_date(slots, ZONE))
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("count", [10, 100])
+def test_serialize_links(benchmark, count):
+    links = with_ids(data.make_links(0, count, random.Random(count)))
+    adapter = TypeAdapter(List[SchedulingLinkResponse])
+    benchmark(lambda: adapter.dump_json(adapter.validate_python(links, from_attributes=True)))
+
+
+@pytest.mark.parametrize("count", [100, 1000])
+def test_serialize_meetings(benchmark, count):
+    rng = random.Random(count)
+    windows = data.make_windows(rng)
+    links = with_ids(data.make_links(0, 3, rng))
+    meetings = data.make_meetings(links, windows, count, FIRST_DAY, 365, rng)
+    created = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    for meeting_id, meeting in enumerate(meetings, 1):
+        meeting.id, meeting.user_id, meeting.created_at = meeting_id, 1, created
+        meeting.scheduling_link_id = meeting.scheduling_link.id
+    adapter = TypeAdapter(List[MeetingResponse])
+    benchmark(lambda: adapter.dump_json(adapter.validate_python(meetings, from_attributes=True)))
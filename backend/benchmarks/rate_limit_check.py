@@ -0,0 +1,105 @@
+"""Check the rate limiter and public cache on both backends.
+
+The Redis backends run against fakeredis, an in-process Redis with Lua
+support, so no server is needed. Two clients on one fake server stand in
+for two uvicorn workers. Run from the backend directory:
+
+    pip install -r benchmarks/requirements.txt
+    python -m benchmarks.rate_limit_check
+"""
+import asyncio
+import sys
+
+import httpx
+from fastapi import Depends, FastAPI
+
+import rate_limit
+from services.kv_store import MemoryStore, RedisStore
+
+
+def check(name: str, ok: bool, detail: str = "") -> bool:
+    print(f"{'ok  ' if ok else 'FAIL'} {name}{': ' + detail if detail else ''}")
+    return ok
+
+
+async def check_limiter(label: str, workers) -> bool:
+    ok = True
+    bucket = [("book:10.0.0.1:intro", 5, 5 / 60)]
+    results = [await workers[i % len(workers)].take(bucket) for i in range(7)]
+    ok &= check(f"{label}: burst of capacity allowed", all(wait == 0 for wait in results[:5]), str(results))
+    ok &= check(f"{label}: over capacity refused", all(wait > 0 for wait in results[5:]), str(results))
+    # One token refills every 12 seconds
+    ok &= check(f"{label}: wait is time to next token", 11 < results[6] <= 12, f"{results[6]:.2f}s")
+
+    other = await workers[0].take([("book:10.0.0.2:intro", 5, 5 / 60)])
+    ok &= check(f"{label}: other clients unaffected", other == 0)
+
+    # All or nothing: a refused request must not drain the bucket that had room
+    tight = ("slots:10.0.0.3:1", 1, 1 / 60)
+    roomy = ("ip:10.0.0.3", 3, 3 / 60)
+    await workers[0].take([tight, roomy])
+    await workers[-1].take([tight, roomy])
+    await workers[0].take([tight, roomy])
+    left = await workers[-1].take([("slots:10.0.0.3:2", 1, 1 / 60), roomy])
+    ok &= check(f"{label}: refused requests take no tokens", left == 0)
+
+    fast = [("fast:10.0.0.4", 1, 20.0)]
+    await workers[0].take(fast)
+    await asyncio.sleep(0.1)
+    ok &= check(f"{label}: tokens refill", await workers[-1].take(fast) == 0)
+    return ok
+
+
+async def check_store(label: str, workers) -> bool:
+    ok = True
+    await workers[0].set("link:intro", {"etag": '"abc"', "body": {"slug": "intro"}}, ttl_seconds=60)
+    ok &= check(f"{label}: value visible", await workers[-1].get("link:intro") == {"etag": '"abc"', "body": {"slug": "intro"}})
+    await workers[-1].delete("link:intro")
+    ok &= check(f"{label}: delete visible", await workers[0].get("link:intro") is None)
+    await workers[0].set("slots:short", "{}", ttl_seconds=0.05)
+    await asyncio.sleep(0.1)
+    ok &= check(f"{label}: entries expire", await workers[-1].get("slots:short") is None)
+    return ok
+
+
+async def check_dependency() -> bool:
+    rate_limit.limiter = rate_limit.MemoryTokenBuckets(100)
+    rate_limit.RULES["book"] = (2, 2 / 60)
+    app = FastAPI()
+
+    @app.post("/{slug}/book", dependencies=[Depends(rate_limit.rate_limit("book", "slug"))])
+    async def book(slug: str):
+        return {"slug": slug}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        statuses = [(await client.post("/intro/book")).status_code for _ in range(3)]
+        refused = await client.post("/intro/book")
+        other = await client.post("/pricing/book")
+    ok = check("endpoint: 429 after the burst", statuses == [200, 200, 429], str(statuses))
+    ok &= check("endpoint: Retry-After set", refused.headers.get("retry-after") == "30", str(refused.headers.get("retry-after")))
+    ok &= check("endpoint: buckets are per slug", other.status_code == 200, str(other.status_code))
+    return ok
+
+
+async def main() -> int:
+    try:
+        from fakeredis import FakeServer
+        from fakeredis.aioredis import FakeRedis
+    except ImportError:
+        print("Install fakeredis with Lua support: pip install -r benchmarks/requirements.txt")
+        return 2
+
+    ok = await check_limiter("memory", [rate_limit.MemoryTokenBuckets(100)])
+    ok &= await check_store("memory", [MemoryStore(100)])
+
+    server = FakeServer()
+    workers = [FakeRedis(server=server) for _ in range(2)]
+    ok &= await check_limiter("redis", [rate_limit.RedisTokenBuckets("", client=client) for client in workers])
+    ok &= await check_store("redis", [RedisStore("", "public", client=client) for client in workers])
+
+    ok &= await check_dependency()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
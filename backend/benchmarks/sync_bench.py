@@ -0,0 +1,47 @@
+"""Compare full and incremental calendar syncs against the local fake.
+
+Run from the backend directory:
+
+    python -m benchmarks.sync_bench
+"""
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.fake_google import FakeCalendarService
+from services.calendar_sync import fetch_changes
+
+CALENDAR_SIZES = [100, 1_000, 10_000]
+CHANGES_PER_REFRESH = 5
+
+
+def make_calendar(size: int, seed: int = 0) -> FakeCalendarService:
+    rng = random.Random(seed)
+    service = FakeCalendarService()
+    now = datetime.now(timezone.utc)
+    for _ in range(size):
+        start = now + timedelta(minutes=rng.randrange(0, 90 * 24 * 60, 15))
+        service.add_event(start, start + timedelta(minutes=rng.choice([30, 60])))
+    return service
+
+
+def main():
+    print(f"{'events':>8} {'full items':>11} {'full calls':>11} {'delta items':>12} {'delta calls':>12} {'delta (ms)':>11}")
+    for size in CALENDAR_SIZES:
+        service = make_calendar(size)
+        changes = fetch_changes(service, 1, None)
+        full_items, full_calls = service.items_returned, service.calls
+
+        for event_id in random.Random(1).sample(sorted(service.events_by_id), CHANGES_PER_REFRESH):
+            service.move_event(event_id, timedelta(minutes=30))
+        service.items_returned = service.calls = 0
+        started = time.perf_counter()
+        delta = fetch_changes(service, 1, changes.next_sync_token)
+        elapsed = time.perf_counter() - started
+        assert not delta.full and len(delta.items) == CHANGES_PER_REFRESH
+
+        print(f"{size:>8} {full_items:>11} {full_calls:>11} {service.items_returned:>12} {service.calls:>12} {elapsed * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
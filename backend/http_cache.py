@@ -0,0 +1,52 @@
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Optional
+import hashlib
+import os
+
+from services.kv_store import cache_store
+
+# Conditional GET support for public read endpoints. Handlers build an ETag
+# from a cheap fingerprint of their inputs, answer 304 when the client
+# already has that version, and mark responses cacheable for a short time so
+# browsers and a CDN can absorb repeated polling.
+
+AVAILABILITY_MAX_AGE_SECONDS = int(os.getenv("AVAILABILITY_MAX_AGE_SECONDS", "30"))
+LINK_MAX_AGE_SECONDS = int(os.getenv("LINK_MAX_AGE_SECONDS", "60"))
+
+def make_etag(*parts) -> str:
+    """A strong ETag for the given fingerprint parts."""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+def cache_headers(etag: str, max_age: int) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+def not_modified(request: Request, etag: str, max_age: int) -> Optional[Response]:
+    """Return a 304 response if the request's If-None-Match matches ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers=cache_headers(etag, max_age))
+    return None
+
+async def availability_version(db: AsyncSession, user_id: int) -> str:
+    """A token that changes whenever any worker changes the user's bookings or calendars.
+
+    Kept in ``cache_store`` rather than ``public_cache``, which is per process
+    by default, so every worker issues the same ETag. Read on the request's
+    session, so the request never needs a second pooled connection.
+    """
+    store = cache_store.using(db)
+    version = await store.get(f"availability-version:{user_id}")
+    if version is None:
+        version = os.urandom(8).hex()
+        await store.set(f"availability-version:{user_id}", version)
+    return version
+
+async def bump_availability_version(db: AsyncSession, user_id: int) -> None:
+    """Start a new version. Commits ``db``, so call it after the change itself is committed."""
+    await cache_store.using(db).set(f"availability-version:{user_id}", os.urandom(8).hex())
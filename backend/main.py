@@ -1,9 +1,15 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from typing import Dict
 
-from routers import scheduling_links, google_calendar, scheduling_windows
+from routers import scheduling_links, google_calendar, scheduling_windows, meetings
+from routers.google_calendar import CALENDAR_ERRORS_HEADER
+from pagination import NEXT_CURSOR_HEADER
+from services.credentials import credential_manager
+from services.google_client import google_clients
+from services import kv_store, metrics, pool_metrics, profiling
 
 app = FastAPI(title="Scheduler API")
 
@@ -14,18 +20,64 @@ app.add_middleware(
     allow_credentials=True,  # Changed to True to allow credentials
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, CALENDAR_ERRORS_HEADER],
     max_age=3600,
 )
+# Requests with a valid X-Profile token get their profile instead of a body
+app.add_middleware(profiling.ProfilingMiddleware)
+# Added last so it wraps everything, CORS included
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Include routers
 app.include_router(scheduling_links.router)
 app.include_router(google_calendar.router)
 app.include_router(scheduling_windows.router)
+app.include_router(meetings.router)
+
+@app.on_event("startup")
+def preload_google_discovery() -> None:
+    # Served from the local discovery cache, so startup works offline
+    google_clients.preload(("calendar", "v3"), ("oauth2", "v2"))
+
+@app.on_event("startup")
+async def start_credential_refresher() -> None:
+    app.state.credential_refresher = asyncio.create_task(credential_manager.run_refresher())
+
+@app.on_event("shutdown")
+async def stop_credential_refresher() -> None:
+    app.state.credential_refresher.cancel()
+
+@app.on_event("startup")
+async def start_kv_sweeper() -> None:
+    app.state.kv_sweeper = asyncio.create_task(kv_store.run_sweeper())
+
+@app.on_event("shutdown")
+async def stop_kv_sweeper() -> None:
+    app.state.kv_sweeper.cancel()
+
+@app.on_event("startup")
+def start_stack_sampler() -> None:
+    app.state.stack_sampler = profiling.start_sampler()
+
+@app.on_event("shutdown")
+def stop_stack_sampler() -> None:
+    if app.state.stack_sampler is not None:
+        app.state.stack_sampler.stop()
 
 @app.get("/")
 async def root() -> Dict[str, str]:
     return {"message": "Scheduler API is running"}
 
+@app.get("/metrics/db-pool")
+async def db_pool_metrics() -> Dict[str, Dict]:
+    """Checkout counters for this worker's connection pools."""
+    return pool_metrics.snapshot()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Request, database, Google API and pool metrics for this worker, in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""add calendar events table and sync tokens
+
+Revision ID: add_calendar_events_table
+Revises: fc01da0eb557, merge_windows_heads
+Create Date: 2025-06-02 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_calendar_events_table'
+down_revision = ('fc01da0eb557', 'merge_windows_heads')
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('google_calendars', sa.Column('sync_token', sa.String(), nullable=True))
+    op.add_column('google_calendars', sa.Column('synced_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('google_calendars', sa.Column('synced_until', sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table('calendar_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('google_calendar_id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.String(), nullable=False),
+        sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('end_time', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('transparent', sa.Boolean(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['google_calendar_id'], ['google_calendars.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('google_calendar_id', 'event_id')
+    )
+    op.create_index(op.f('ix_calendar_events_id'), 'calendar_events', ['id'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_calendar_events_id'), table_name='calendar_events')
+    op.drop_table('calendar_events')
+    op.drop_column('google_calendars', 'synced_until')
+    op.drop_column('google_calendars', 'synced_at')
+    op.drop_column('google_calendars', 'sync_token')
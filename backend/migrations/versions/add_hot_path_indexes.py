@@ -0,0 +1,41 @@
+"""add indexes for hot query paths
+
+Revision ID: add_hot_path_indexes
+Revises: add_token_expires_at
+Create Date: 2025-06-10 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_hot_path_indexes'
+down_revision = 'add_token_expires_at'
+branch_labels = None
+depends_on = None
+
+# (name, table, columns, kwargs)
+INDEXES = [
+    ('ix_meetings_user_id_meeting_time', 'meetings', ['user_id', 'meeting_time'], {}),
+    ('ix_meetings_scheduling_link_id_meeting_time', 'meetings', ['scheduling_link_id', 'meeting_time'], {}),
+    ('ix_scheduling_windows_user_id_day_of_week', 'scheduling_windows', ['user_id', 'day_of_week'], {}),
+    ('ix_google_calendars_user_id', 'google_calendars', ['user_id'], {}),
+    ('ix_custom_questions_scheduling_link_id', 'custom_questions', ['scheduling_link_id'], {}),
+    # Busy-time lookups skip "show as available" events, so leave them out
+    ('ix_calendar_events_busy', 'calendar_events', ['google_calendar_id', 'start_time'], {
+        'postgresql_include': ['end_time'],
+        'postgresql_where': sa.text('transparent IS NOT true'),
+    }),
+]
+
+def upgrade():
+    # CONCURRENTLY can't run inside a transaction, but keeps meetings writable
+    # while the index builds
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True, **kwargs)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
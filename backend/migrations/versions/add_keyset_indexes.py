@@ -0,0 +1,26 @@
+"""add keyset pagination indexes
+
+Revision ID: add_keyset_indexes
+Revises: add_hot_path_indexes
+Create Date: 2025-06-12 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_keyset_indexes'
+down_revision = 'add_hot_path_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # List endpoints page through a user's rows ordered by (created_at, id)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_meetings_user_id_created_at_id', 'meetings', ['user_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_scheduling_links_user_id_created_at_id', 'scheduling_links', ['user_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True, if_not_exists=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_scheduling_links_user_id_created_at_id', table_name='scheduling_links', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_meetings_user_id_created_at_id', table_name='meetings', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,25 @@
+"""add expiry indexes to sessions and cache
+
+Revision ID: add_kv_expiry_indexes
+Revises: add_jobs_table
+Create Date: 2025-06-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_kv_expiry_indexes'
+down_revision = 'add_jobs_table'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index('ix_sessions_expires_at', 'sessions', ['expires_at'], unique=False, postgresql_where=sa.text('expires_at IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_cache_expires_at', 'cache', ['expires_at'], unique=False, postgresql_where=sa.text('expires_at IS NOT NULL'), postgresql_concurrently=True, if_not_exists=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_cache_expires_at', table_name='cache', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_sessions_expires_at', table_name='sessions', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,45 @@
+"""add end time and an overlap constraint to meetings
+
+Revision ID: add_meeting_overlap_constraint
+Revises: add_keyset_indexes
+Create Date: 2025-06-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_meeting_overlap_constraint'
+down_revision = 'add_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+# For meetings whose link is gone or has no length
+DEFAULT_MEETING_LENGTH = 30
+
+def upgrade():
+    # Lets a GiST index mix scalar equality (user_id) with range overlap
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.add_column('meetings', sa.Column('end_time', sa.DateTime(timezone=True), nullable=True))
+    op.execute(f"""
+        UPDATE meetings SET end_time = meetings.meeting_time + COALESCE(
+            (SELECT meeting_length FROM scheduling_links WHERE scheduling_links.id = meetings.scheduling_link_id),
+            {DEFAULT_MEETING_LENGTH}
+        ) * interval '1 minute'
+    """)
+    # A NULL end_time would make tstzrange unbounded and block every later
+    # booking for the advisor. Meetings with no meeting_time get no end_time
+    # either, so this fails until they are removed.
+    op.alter_column('meetings', 'end_time', nullable=False)
+    # Existing double bookings have to be resolved by hand before this applies
+    op.create_exclude_constraint(
+        'meetings_no_overlap',
+        'meetings',
+        ('user_id', '='),
+        (sa.func.tstzrange(sa.text('meeting_time'), sa.text('end_time')), '&&'),
+        using='gist'
+    )
+
+def downgrade():
+    op.drop_constraint('meetings_no_overlap', 'meetings')
+    op.drop_column('meetings', 'end_time')
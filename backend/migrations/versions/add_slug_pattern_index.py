@@ -0,0 +1,25 @@
+"""add prefix-search index on scheduling_links.slug
+
+Revision ID: add_slug_pattern_index
+Revises: add_kv_expiry_indexes
+Create Date: 2025-06-24 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_slug_pattern_index'
+down_revision = 'add_kv_expiry_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # next_free_slug looks up "base-%"; ix_scheduling_links_slug uses the
+    # database collation, which can't serve LIKE prefixes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_scheduling_links_slug_pattern', 'scheduling_links', ['slug'], unique=False, postgresql_ops={'slug': 'varchar_pattern_ops'}, postgresql_concurrently=True, if_not_exists=True)
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_scheduling_links_slug_pattern', table_name='scheduling_links', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,21 @@
+"""add token expiry to google calendars
+
+Revision ID: add_token_expires_at
+Revises: add_calendar_events_table
+Create Date: 2025-06-03 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_token_expires_at'
+down_revision = 'add_calendar_events_table'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('google_calendars', sa.Column('token_expires_at', sa.DateTime(timezone=True), nullable=True))
+
+def downgrade():
+    op.drop_column('google_calendars', 'token_expires_at')
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, JSON, ARRAY, Text
+from sqlalchemy import DDL, event, Column, Integer, String, DateTime, ForeignKey, Boolean, JSON, ARRAY, Text, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -6,6 +7,10 @@ from datetime import datetime
 
 Base = declarative_base()
 
+# Booking side effects create events with this; accounts connected before it
+# was requested have to go through the consent screen again
+CALENDAR_EVENTS_SCOPE = "https://www.googleapis.com/auth/calendar.events"
+
 class User(Base):
     __tablename__ = "users"
     
@@ -36,6 +41,7 @@ class Calendar(Base):
 
 class SchedulingWindow(Base):
     __tablename__ = "scheduling_windows"
+    __table_args__ = (Index("ix_scheduling_windows_user_id_day_of_week", "user_id", "day_of_week"),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -48,6 +54,11 @@ class SchedulingWindow(Base):
 
 class SchedulingLink(Base):
     __tablename__ = "scheduling_links"
+    __table_args__ = (
+        Index("ix_scheduling_links_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Serves the "slug LIKE 'base-%'" lookup for free slugs under any collation
+        Index("ix_scheduling_links_slug_pattern", "slug", postgresql_ops={"slug": "varchar_pattern_ops"}),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -66,7 +77,7 @@ class CustomQuestion(Base):
     __tablename__ = "custom_questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    scheduling_link_id = Column(Integer, ForeignKey("scheduling_links.id"))
+    scheduling_link_id = Column(Integer, ForeignKey("scheduling_links.id"), index=True)
     question = Column(String)
     required = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -76,6 +87,19 @@ class CustomQuestion(Base):
 
 class Meeting(Base):
     __tablename__ = "meetings"
+    __table_args__ = (
+        Index("ix_meetings_user_id_meeting_time", "user_id", "meeting_time"),
+        Index("ix_meetings_scheduling_link_id_meeting_time", "scheduling_link_id", "meeting_time"),
+        Index("ix_meetings_user_id_created_at_id", "user_id", "created_at", "id"),
+        # An advisor can't be booked twice for the same time. Rows only conflict
+        # with rows for the same user_id, so advisors never contend.
+        ExcludeConstraint(
+            ("user_id", "="),
+            (func.tstzrange(text("meeting_time"), text("end_time")), "&&"),
+            name="meetings_no_overlap",
+            using="gist"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -83,6 +107,7 @@ class Meeting(Base):
     email = Column(String)
     linkedin_url = Column(String)
     meeting_time = Column(DateTime(timezone=True))
+    end_time = Column(DateTime(timezone=True), nullable=False)  # meeting_time + the link's meeting_length
     answers = Column(JSON)  # Store custom question answers
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True))
@@ -90,8 +115,34 @@ class Meeting(Base):
     user = relationship("User", back_populates="meetings")
     scheduling_link = relationship("SchedulingLink", back_populates="meetings")
 
+# meetings_no_overlap mixes scalar equality and range overlap in one GiST index
+event.listen(Meeting.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+class Job(Base):
+    """A queued side effect, run by worker.py outside the request that enqueued it."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers only ever look for due, queued jobs
+        Index("ix_jobs_due", "run_at", postgresql_where=text("status = 'queued'")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False)
+    idempotency_key = Column(String, unique=True, nullable=False)  # Enqueuing the same key twice is a no-op
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=8)
+    run_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
 class Session(Base):
     __tablename__ = "sessions"
+    # The expiry sweeper only looks at rows that can expire
+    __table_args__ = (Index("ix_sessions_expires_at", "expires_at", postgresql_where=text("expires_at IS NOT NULL")),)
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -103,6 +154,8 @@ class Session(Base):
 
 class Cache(Base):
     __tablename__ = "cache"
+    # The expiry sweeper only looks at rows that can expire
+    __table_args__ = (Index("ix_cache_expires_at", "expires_at", postgresql_where=text("expires_at IS NOT NULL")),)
     
     id = Column(Integer, primary_key=True, index=True)
     key = Column(String, unique=True, index=True)
@@ -114,7 +167,7 @@ class GoogleCalendar(Base):
     __tablename__ = "google_calendars"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     email = Column(String, nullable=False)
     access_token = Column(String, nullable=False)
     refresh_token = Column(String, nullable=False)
@@ -122,7 +175,39 @@ class GoogleCalendar(Base):
     client_id = Column(String, nullable=False)
     client_secret = Column(String, nullable=False)
     scopes = Column(ARRAY(String), nullable=False)
+    token_expires_at = Column(DateTime(timezone=True))
+    sync_token = Column(String)  # nextSyncToken from the last events sync
+    synced_at = Column(DateTime(timezone=True))
+    synced_until = Column(DateTime(timezone=True))  # End of the range the sync token covers
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True))
 
-    user = relationship("User", back_populates="google_calendars") 
\ No newline at end of file
+    user = relationship("User", back_populates="google_calendars")
+    # The database cascades the delete, so events never need loading first
+    events = relationship("CalendarEvent", back_populates="google_calendar", cascade="all, delete-orphan", passive_deletes=True)
+
+    @property
+    def needs_reconsent(self) -> bool:
+        """True when the account never granted the scope booked meetings' events need."""
+        return CALENDAR_EVENTS_SCOPE not in (self.scopes or [])
+
+class CalendarEvent(Base):
+    __tablename__ = "calendar_events"
+    __table_args__ = (
+        UniqueConstraint("google_calendar_id", "event_id"),
+        # Busy-time lookups skip "show as available" events
+        Index(
+            "ix_calendar_events_busy", "google_calendar_id", "start_time",
+            postgresql_include=["end_time"], postgresql_where=text("transparent IS NOT true")
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    google_calendar_id = Column(Integer, ForeignKey("google_calendars.id", ondelete="CASCADE"), nullable=False)
+    event_id = Column(String, nullable=False)  # Google's event id
+    start_time = Column(DateTime(timezone=True), nullable=False)
+    end_time = Column(DateTime(timezone=True), nullable=False)
+    transparent = Column(Boolean, default=False)  # "Show as available" events don't block time
+    updated_at = Column(DateTime(timezone=True))
+
+    google_calendar = relationship("GoogleCalendar", back_populates="events") 
\ No newline at end of file
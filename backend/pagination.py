@@ -0,0 +1,90 @@
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional, Sequence, Tuple, Type
+from datetime import datetime
+import base64
+import os
+
+# Keyset pagination for list endpoints: rows are ordered by (created_at, id)
+# and the cursor is the last row's key, so every page is an index range scan
+# no matter how deep the client pages. The next cursor is returned in the
+# X-Next-Cursor header, keeping list responses plain JSON arrays. Paging is
+# opt-in: without ``limit`` or ``cursor`` the whole list is returned, as the
+# frontend expects.
+
+PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "1000"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+class PageParams:
+    """Query parameters shared by paginated list endpoints."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description=f"Page size; defaults to {PAGE_SIZE} once paging"),
+        fields: Optional[str] = Query(None, description="Comma-separated columns to return")
+    ):
+        self.after = decode_cursor(cursor) if cursor else None
+        # None means unpaginated
+        self.limit = limit or (PAGE_SIZE if cursor else None)
+        self.fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+async def paginate(
+    db: AsyncSession,
+    model,
+    page: PageParams,
+    *criteria,
+    schema: Type[BaseModel],
+    options: Sequence[Any] = ()
+) -> JSONResponse:
+    """Return one page of ``model`` rows matching ``criteria``.
+
+    With ``fields`` only those columns are selected; otherwise whole rows
+    (plus ``options``, e.g. eager loads) are serialized through ``schema``.
+    """
+    key = (model.created_at, model.id)
+    if page.fields:
+        columns = model.__table__.columns
+        unknown = [field for field in page.fields if field not in columns or field not in schema.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        # The key columns are always selected so the next cursor can be built
+        stmt = select(*key, *(columns[field] for field in page.fields if field not in ("created_at", "id")))
+    else:
+        stmt = select(model).options(*options)
+    stmt = stmt.where(*criteria)
+    if page.after:
+        stmt = stmt.where(tuple_(*key) > tuple_(*page.after))
+    stmt = stmt.order_by(*key)
+    if page.limit is not None:
+        # One extra row tells us whether there is a next page
+        stmt = stmt.limit(page.limit + 1)
+
+    if page.fields:
+        rows: List[Any] = (await db.execute(stmt)).all()
+        content = [{field: getattr(row, field) for field in page.fields} for row in rows[:page.limit]]
+    else:
+        rows = (await db.scalars(stmt)).all()
+        content = [schema.model_validate(row) for row in rows[:page.limit]]
+
+    headers = {}
+    if page.limit is not None and len(rows) > page.limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[page.limit - 1].created_at, rows[page.limit - 1].id)
+    return JSONResponse(jsonable_encoder(content), headers=headers)
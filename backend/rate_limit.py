@@ -0,0 +1,156 @@
+from fastapi import HTTPException, Request
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+import math
+import os
+import time
+
+# Token-bucket rate limiting for the public booking endpoints. Every request
+# takes one token from a bucket for its client IP and slug and one from a
+# bucket for the IP alone, so a client can neither hammer one link nor walk
+# through all of them. Buckets live in this process by default;
+# RATE_LIMIT_BACKEND=redis keeps them in REDIS_URL so all workers share them.
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# Number of reverse proxies in front of the app that append to X-Forwarded-For;
+# 0 uses the socket's peer address
+FORWARDED_PROXY_HOPS = int(os.getenv("FORWARDED_PROXY_HOPS", "0"))
+
+def parse_rule(value: str) -> Tuple[float, float]:
+    """Parse "<requests>/<seconds>" into (capacity, tokens refilled per second)."""
+    requests, seconds = value.split("/")
+    return float(requests), float(requests) / float(seconds)
+
+RULES: Dict[str, Tuple[float, float]] = {
+    "ip": parse_rule(os.getenv("RATE_LIMIT_PER_IP", "300/60")),
+    "link": parse_rule(os.getenv("RATE_LIMIT_LINK", "60/60")),
+    "slots": parse_rule(os.getenv("RATE_LIMIT_SLOTS", "30/60")),
+    "book": parse_rule(os.getenv("RATE_LIMIT_BOOK", "5/60")),
+}
+
+Bucket = Tuple[str, float, float]  # key, capacity, refill per second
+
+class MemoryTokenBuckets:
+    """Buckets for this process only, least recently used dropped first."""
+
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, buckets: List[Bucket], cost: float = 1) -> float:
+        """Take ``cost`` tokens from every bucket, or from none of them.
+        Returns 0 on success, otherwise the seconds until it would succeed."""
+        now = time.monotonic()
+        levels = []
+        wait = 0.0
+        for key, capacity, rate in buckets:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens < cost:
+                wait = max(wait, (cost - tokens) / rate)
+            levels.append(tokens)
+        for (key, capacity, rate), tokens in zip(buckets, levels):
+            self._buckets[key] = (tokens - cost if wait == 0 else tokens, now)
+            self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return wait
+
+# Same algorithm as MemoryTokenBuckets, atomic on the server. Time comes from
+# the Redis clock so workers with skewed clocks agree; keys expire once their
+# bucket would be full again, as a missing key reads as a full bucket.
+TAKE_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + tonumber(time[2]) / 1000
+local cost = tonumber(ARGV[1])
+local wait = 0
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated')
+    local tokens = tonumber(bucket[1]) or capacity
+    local updated = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    if tokens < cost then
+        wait = math.max(wait, (cost - tokens) / rate)
+    end
+    levels[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i])
+    local rate = tonumber(ARGV[2 * i + 1])
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - cost
+    end
+    redis.call('HSET', key, 'tokens', tokens, 'updated', now)
+    redis.call('PEXPIRE', key, math.ceil((capacity - tokens) / rate) + 1000)
+end
+return tostring(wait)
+"""
+
+class RedisTokenBuckets:
+    def __init__(self, url: str, namespace: str = "ratelimit", client=None):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.redis = client
+        self.prefix = f"{namespace}:"
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    async def take(self, buckets: List[Bucket], cost: float = 1) -> float:
+        args = [cost]
+        for key, capacity, rate in buckets:
+            # The script works in milliseconds
+            args += [capacity, rate / 1000]
+        wait_ms = await self._take(keys=[self.prefix + key for key, _, _ in buckets], args=args)
+        return float(wait_ms) / 1000
+
+def make_limiter():
+    if RATE_LIMIT_BACKEND == "redis":
+        return RedisTokenBuckets(REDIS_URL)
+    return MemoryTokenBuckets(RATE_LIMIT_MAX_BUCKETS)
+
+limiter = make_limiter()
+
+def client_ip(request: Request) -> str:
+    if FORWARDED_PROXY_HOPS:
+        # Each proxy appends the address it received from; earlier entries
+        # are whatever the client claimed
+        forwarded = [part.strip() for part in request.headers.get("x-forwarded-for", "").split(",") if part.strip()]
+        if len(forwarded) >= FORWARDED_PROXY_HOPS:
+            return forwarded[-FORWARDED_PROXY_HOPS]
+    return request.client.host if request.client else "unknown"
+
+def rate_limit(rule: str, path_param: Optional[str] = None):
+    """A dependency that answers 429 once the caller's buckets for ``rule``
+    (keyed by IP and the ``path_param`` value) or for its IP run out."""
+    capacity, rate = RULES[rule]
+    ip_capacity, ip_rate = RULES["ip"]
+
+    async def dependency(request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+        ip = client_ip(request)
+        scope = request.path_params.get(path_param, "") if path_param else ""
+        try:
+            wait = await limiter.take([
+                (f"{rule}:{ip}:{scope}", capacity, rate),
+                (f"ip:{ip}", ip_capacity, ip_rate),
+            ])
+        except Exception as e:
+            # Fail open: a limiter outage shouldn't take booking down with it
+            print(f"Rate limiter unavailable, allowing request: {e}")
+            return
+        if wait > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please retry later",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+    return dependency
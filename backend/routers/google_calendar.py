@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from functools import partial
 import google.oauth2.credentials
 import google_auth_oauthlib.flow
-import googleapiclient.discovery
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import os
 from dotenv import load_dotenv
 
-from database import get_db
-from models import User, GoogleCalendar
+from database import get_db, run_in_session
+from models import CALENDAR_EVENTS_SCOPE, User, GoogleCalendar
 from schemas import GoogleCalendarResponse
 from auth import create_access_token
+from http_cache import bump_availability_version
+from pagination import PageParams, paginate
+from services.busy_cache import busy_cache
+from services import calendar_sync
+from services.availability import Interval, event_intervals, freebusy_intervals, merge_intervals, to_rfc3339
+from services.calendar_fetch import FetchResult, fetch_all, run_all
+from services.credentials import credential_manager, from_google_expiry
+from services.google_client import google_clients
 
 # Load environment variables
 load_dotenv()
@@ -21,11 +32,17 @@ load_dotenv()
 SCOPES = [
     'openid',
     'https://www.googleapis.com/auth/calendar.readonly',
+    CALENDAR_EVENTS_SCOPE,
     'https://www.googleapis.com/auth/userinfo.email'
 ]
 CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID')
 CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET')
 REDIRECT_URI = os.getenv('GOOGLE_REDIRECT_URI')
+BUSY_SOURCE = os.getenv('BUSY_SOURCE', 'sync')
+# Calendars in each connected account that count as busy time
+FREEBUSY_CALENDARS = os.getenv('FREEBUSY_CALENDARS', 'primary').split(',')
+# Lists the calendars /events could not load, keeping its body a plain list
+CALENDAR_ERRORS_HEADER = "X-Calendar-Errors"
 
 router = APIRouter(prefix="/auth/google", tags=["google-calendar"])
 
@@ -53,8 +70,16 @@ async def google_auth():
     
     return {"authorization_url": authorization_url}
 
+def fetch_google_identity(flow: google_auth_oauthlib.flow.Flow, code: str):
+    """Exchange the authorization code and look up the account's email. Blocks on Google."""
+    flow.fetch_token(code=code)
+    credentials = flow.credentials
+    with google_clients.service('oauth2', 'v2', credentials) as service:
+        user_info = service.userinfo().get().execute()
+    return credentials, user_info
+
 @router.get("/callback")
-async def oauth2callback(code: str, db: Session = Depends(get_db)):
+async def oauth2callback(code: str, db: AsyncSession = Depends(get_db)):
     """Handle the OAuth2 callback from Google."""
     flow = google_auth_oauthlib.flow.Flow.from_client_config(
         {
@@ -70,24 +95,19 @@ async def oauth2callback(code: str, db: Session = Depends(get_db)):
     flow.redirect_uri = REDIRECT_URI
     
     try:
-        # Exchange authorization code for credentials
-        flow.fetch_token(code=code)
-        credentials = flow.credentials
-        
-        # Get user info from Google
-        service = googleapiclient.discovery.build('oauth2', 'v2', credentials=credentials)
-        user_info = service.userinfo().get().execute()
+        # Exchange authorization code for credentials and get user info from Google
+        credentials, user_info = await run_in_threadpool(fetch_google_identity, flow, code)
         
         # Get or create user
-        user = db.query(User).filter(User.email == user_info['email']).first()
+        user = await db.scalar(select(User).where(User.email == user_info['email']))
         if not user:
             user = User(
                 email=user_info['email'],
                 google_id=user_info.get('id')
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
+            await db.refresh(user)
         
         # Store credentials in database
         calendar = GoogleCalendar(
@@ -98,14 +118,18 @@ async def oauth2callback(code: str, db: Session = Depends(get_db)):
             token_uri=credentials.token_uri,
             client_id=CLIENT_ID,
             client_secret=CLIENT_SECRET,
-            scopes=credentials.scopes
+            scopes=credentials.scopes,
+            token_expires_at=from_google_expiry(credentials.expiry)
         )
         
         db.add(calendar)
-        db.commit()
+        await db.commit()
+        busy_cache.invalidate(user.id)
+        await bump_availability_version(db, user.id)
         
         # Create JWT token for the user
-        token = create_access_token({"sub": str(user.id)})
+        # email and name let AUTH_STATELESS skip the user lookup
+        token = create_access_token({"sub": str(user.id), "email": user.email, "name": user.name})
         # Redirect to frontend with token as query param
         return RedirectResponse(url=f"http://localhost:3000/login?token={token}")
     except Exception as e:
@@ -113,66 +137,191 @@ async def oauth2callback(code: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/calendars", response_model=List[GoogleCalendarResponse])
-async def list_calendars(db: Session = Depends(get_db)):
+async def list_calendars(page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
     """List all connected Google calendars for the user."""
-    calendars = db.query(GoogleCalendar).filter(GoogleCalendar.user_id == 1).all()  # Temporarily hardcoded
-    return calendars
+    return await paginate(db, GoogleCalendar, page, GoogleCalendar.user_id == 1, schema=GoogleCalendarResponse)  # Temporarily hardcoded
+
+def fetch_calendar_events(
+    calendar_id: int,
+    credentials: google.oauth2.credentials.Credentials,
+    time_min: str,
+    time_max: str
+) -> List[dict]:
+    """Fetch one calendar's events. Runs on the calendar_fetch thread pool."""
+    with google_clients.service('calendar', 'v3', credentials, key=calendar_id) as service:
+        events_result = service.events().list(
+            calendarId='primary',
+            timeMin=time_min,
+            timeMax=time_max,
+            singleEvents=True,
+            orderBy='startTime'
+        ).execute()
+    return events_result.get('items', [])
+
+def list_user_events(db: Session, user_id: int, start: datetime, end: datetime) -> FetchResult:
+    """Get events from all of a user's connected calendars for the given range.
+
+    Calendars are fetched concurrently; ones that fail are listed in ``errors``.
+    """
+    calendars = db.query(GoogleCalendar).filter(GoogleCalendar.user_id == user_id).all()
+    time_min = to_rfc3339(start)
+    time_max = to_rfc3339(end)
+    jobs = [
+        (calendar.email, partial(fetch_calendar_events, calendar.id, credential_manager.get(calendar), time_min, time_max))
+        for calendar in calendars
+    ]
+    result = fetch_all(jobs)
+    credential_manager.persist_refreshed(db)
+    for error in result.errors:
+        print(f"Error fetching events for calendar {error['calendar']}: {error['error']}")
+    return result
+
+def fetch_calendar_busy(
+    calendar_id: int,
+    credentials: google.oauth2.credentials.Credentials,
+    time_min: str,
+    time_max: str
+) -> List[Interval]:
+    """Fetch one account's busy intervals with a freeBusy query. Runs on the calendar_fetch thread pool."""
+    with google_clients.service('calendar', 'v3', credentials, key=calendar_id) as service:
+        response = service.freebusy().query(body={
+            'timeMin': time_min,
+            'timeMax': time_max,
+            'items': [{'id': calendar} for calendar in FREEBUSY_CALENDARS]
+        }).execute()
+    return freebusy_intervals(response)
+
+def list_user_busy(
+    db: Session,
+    user_id: int,
+    start: datetime,
+    end: datetime
+) -> Tuple[List[Interval], List[Dict[str, str]]]:
+    """Get merged busy intervals across a user's connected accounts, one freeBusy call each."""
+    calendars = db.query(GoogleCalendar).filter(GoogleCalendar.user_id == user_id).all()
+    time_min = to_rfc3339(start)
+    time_max = to_rfc3339(end)
+    jobs = [
+        (calendar.email, partial(fetch_calendar_busy, calendar.id, credential_manager.get(calendar), time_min, time_max))
+        for calendar in calendars
+    ]
+    results, errors = run_all(jobs)
+    credential_manager.persist_refreshed(db)
+    for error in errors:
+        print(f"Error fetching busy time for calendar {error['calendar']}: {error['error']}")
+    return merge_intervals(interval for intervals in results for interval in intervals), errors
+
+def fetch_calendar_changes(
+    calendar_id: int,
+    credentials: google.oauth2.credentials.Credentials,
+    sync_token: Optional[str]
+) -> calendar_sync.CalendarChanges:
+    """Fetch one calendar's changes since its last sync. Runs on the calendar_fetch thread pool."""
+    with google_clients.service('calendar', 'v3', credentials, key=calendar_id) as service:
+        return calendar_sync.fetch_changes(service, calendar_id, sync_token)
+
+def sync_user_calendars(
+    db: Session,
+    user_id: int,
+    max_age_seconds: float = calendar_sync.CALENDAR_SYNC_INTERVAL_SECONDS
+) -> List[Dict[str, str]]:
+    """Pull deltas for a user's calendars that haven't synced within ``max_age_seconds``.
+
+    Returns an error entry for each calendar that could not be synced.
+    """
+    calendars = db.query(GoogleCalendar).filter(GoogleCalendar.user_id == user_id).all()
+    stale = {calendar.id: calendar for calendar in calendars if calendar_sync.is_stale(calendar, max_age_seconds)}
+    if not stale:
+        return []
+    # The session expires rows on commit, so note what each fetch started from
+    fetched_after = {calendar.id: calendar.synced_at for calendar in stale.values()}
+
+    jobs = [
+        (calendar.email, partial(fetch_calendar_changes, calendar.id, credential_manager.get(calendar), calendar_sync.sync_token_for(calendar)))
+        for calendar in stale.values()
+    ]
+    results, errors = run_all(jobs)
+    credential_manager.persist_refreshed(db)
+    changed = 0
+    for changes in results:
+        changed += calendar_sync.apply_changes(db, stale[changes.calendar_id], changes, fetched_after[changes.calendar_id])
+    if changed:
+        busy_cache.invalidate(user_id)
+    for error in errors:
+        print(f"Error syncing calendar {error['calendar']}: {error['error']}")
+    return errors
+
+def load_busy_intervals(
+    db: Session,
+    user_id: int,
+    start: datetime,
+    end: datetime
+) -> Tuple[List[Interval], List[Dict[str, str]]]:
+    """Get a user's busy intervals from the configured BUSY_SOURCE.
+
+    "sync" (the default) refreshes stale calendars incrementally and reads the
+    local event store; "freebusy" asks Google for busy time live, without
+    downloading event payloads; "events" lists every calendar's events live.
+
+    Both live modes make a Google round trip per account on every cache miss,
+    so latency and quota use grow with traffic. Sync costs at most one small
+    delta call per calendar per CALENDAR_SYNC_INTERVAL_SECONDS however busy
+    the booking page is, so it stays the default.
+    """
+    if BUSY_SOURCE == "freebusy":
+        return list_user_busy(db, user_id, start, end)
+    if BUSY_SOURCE == "events":
+        result = list_user_events(db, user_id, start, end)
+        return event_intervals(result.events), result.errors
+    errors = sync_user_calendars(db, user_id)
+    return calendar_sync.busy_intervals(db, user_id, start, end), errors
 
 @router.get("/events")
 async def get_events(
     start_date: datetime,
     end_date: datetime,
-    db: Session = Depends(get_db)
+    response: Response
 ):
-    """Get events from all connected calendars for the given date range."""
-    print(f"Fetching events from {start_date} to {end_date}")
-    calendars = db.query(GoogleCalendar).filter(GoogleCalendar.user_id == 1).all()  # Temporarily hardcoded
-    print(f"Found {len(calendars)} connected calendars")
-    
-    all_events = []
-    for calendar in calendars:
-        print(f"Processing calendar: {calendar.email}")
-        try:
-            credentials = google.oauth2.credentials.Credentials(
-                token=calendar.access_token,
-                refresh_token=calendar.refresh_token,
-                token_uri=calendar.token_uri,
-                client_id=CLIENT_ID,
-                client_secret=CLIENT_SECRET,
-                scopes=calendar.scopes
-            )
-            
-            service = googleapiclient.discovery.build('calendar', 'v3', credentials=credentials)
-            
-            events_result = service.events().list(
-                calendarId='primary',
-                timeMin=start_date.isoformat() + 'Z',
-                timeMax=end_date.isoformat() + 'Z',
-                singleEvents=True,
-                orderBy='startTime'
-            ).execute()
-            
-            events = events_result.get('items', [])
-            print(f"Found {len(events)} events in calendar {calendar.email}")
-            all_events.extend(events)
-        except Exception as e:
-            print(f"Error fetching events for calendar {calendar.email}: {str(e)}")
-            continue
-    
-    return all_events 
+    """Get events from all connected calendars for the given date range.
+
+    Calendars that failed to load are named in the X-Calendar-Errors header.
+    """
+    # Run off the event loop; calendars are fanned out on the fetch pool
+    result = await run_in_session(list_user_events, 1, start_date, end_date)  # Temporarily hardcoded
+    if result.errors:
+        response.headers[CALENDAR_ERRORS_HEADER] = ", ".join(error["calendar"] for error in result.errors)
+    return result.events
+
+@router.post("/sync")
+async def sync_calendars(db: AsyncSession = Depends(get_db)):
+    """Pull the latest changes from all connected calendars into the local store."""
+    errors = await run_in_session(sync_user_calendars, 1, 0)  # Temporarily hardcoded
+    await bump_availability_version(db, 1)
+    return {"errors": errors}
+
+@router.post("/events/refresh")
+async def refresh_events(db: AsyncSession = Depends(get_db)):
+    """Drop cached busy time so the next availability lookup refetches from Google."""
+    busy_cache.invalidate(1)  # Temporarily hardcoded
+    await bump_availability_version(db, 1)  # Temporarily hardcoded
+    return {"message": "Event cache cleared"}
 
 @router.delete("/calendars/{calendar_id}")
-async def disconnect_calendar(calendar_id: int, db: Session = Depends(get_db)):
+async def disconnect_calendar(calendar_id: int, db: AsyncSession = Depends(get_db)):
     """Disconnect a Google Calendar."""
-    calendar = db.query(GoogleCalendar).filter(
+    calendar = await db.scalar(select(GoogleCalendar).where(
         GoogleCalendar.id == calendar_id,
         GoogleCalendar.user_id == 1  # Temporarily hardcoded until auth is implemented
-    ).first()
+    ))
     
     if not calendar:
         raise HTTPException(status_code=404, detail="Calendar not found")
     
-    db.delete(calendar)
-    db.commit()
+    await db.delete(calendar)
+    await db.commit()
+    busy_cache.invalidate(calendar.user_id)
+    await bump_availability_version(db, calendar.user_id)
+    google_clients.discard(calendar.id)
+    credential_manager.forget(calendar.id)
     
     return {"message": "Calendar disconnected"} 
\ No newline at end of file
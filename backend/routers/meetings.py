@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from database import get_db
+from models import Meeting
+from schemas import MeetingResponse
+from auth import get_current_user
+from pagination import PageParams, paginate
+
+router = APIRouter(prefix="/api/meetings", tags=["meetings"])
+
+@router.get("/", response_model=List[MeetingResponse])
+async def list_meetings(
+    scheduling_link_id: Optional[int] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """List the current user's booked meetings, oldest booking first, one page at a time."""
+    criteria = [Meeting.user_id == current_user.id]
+    if scheduling_link_id is not None:
+        criteria.append(Meeting.scheduling_link_id == scheduling_link_id)
+    return await paginate(db, Meeting, page, *criteria, schema=MeetingResponse)
@@ -1,15 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List, Dict
-from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import Integer, cast, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from typing import Iterator, List, Dict, Optional
+from array import array
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import json
+import os
 import pytz
+import random
 import re
 
-from database import get_db
-from models import SchedulingLink, CustomQuestion, SchedulingWindow, Meeting
+from database import get_db, run_in_session, SessionLocal
+from models import SchedulingLink, CustomQuestion, Meeting
 from schemas.scheduling_link import SchedulingLinkCreate, SchedulingLinkResponse, BookingCreate, AvailableSlots
-from routers.google_calendar import get_events
+from routers.google_calendar import load_busy_intervals
+from services import availability, bulk_availability
+from services.busy_cache import busy_cache
+from services.kv_store import public_cache
+from services.profiling import profile_iterator
+from services.side_effects import enqueue_booking_side_effects
+from services.weekly_template import expand_template, weekly_templates
 from auth import get_current_user
+from pagination import PageParams, paginate
+from http_cache import (
+    AVAILABILITY_MAX_AGE_SECONDS, LINK_MAX_AGE_SECONDS, availability_version, bump_availability_version,
+    cache_headers, make_etag, not_modified
+)
+from rate_limit import rate_limit
+
+AVAILABILITY_MAX_DAYS = int(os.getenv("AVAILABILITY_MAX_DAYS", "365"))
+AVAILABILITY_PAGE_DAYS = int(os.getenv("AVAILABILITY_PAGE_DAYS", "7"))
+# Longer horizons are streamed rather than built in memory, so aren't cached
+AVAILABILITY_CACHE_MAX_DAYS = int(os.getenv("AVAILABILITY_CACHE_MAX_DAYS", "31"))
+SLUG_MAX_ATTEMPTS = int(os.getenv("SLUG_MAX_ATTEMPTS", "50"))
+SLUG_INDEX = "ix_scheduling_links_slug"
+MEETING_OVERLAP_CONSTRAINT = "meetings_no_overlap"
 
 router = APIRouter(
     prefix="/api/scheduling-links",
@@ -21,39 +51,71 @@ def generate_slug(title: str) -> str:
     slug = title.lower().replace(" ", "-")
     # Remove any non-alphanumeric characters except hyphens
     slug = re.sub(r'[^a-z0-9-]', '', slug)
+    # An all-digit slug would be routed to get_scheduling_link by id
+    if slug.isdigit():
+        slug = f"link-{slug}"
     return slug
 
+async def next_free_slug(db: AsyncSession, base: str, spread: int = 0) -> str:
+    """Return ``base`` if it's free, else ``base-N`` past the highest suffix in use, in one query.
+
+    ``spread`` > 0 adds a random skip of up to that many numbers, so requests
+    that just collided on the same suffix don't collide again.
+    """
+    taken, highest = (await db.execute(select(
+        func.bool_or(SchedulingLink.slug == base),
+        func.max(cast(func.substring(SchedulingLink.slug, f"^{re.escape(base)}-([0-9]{{1,9}})$"), Integer))
+    ).where(or_(
+        SchedulingLink.slug == base,
+        SchedulingLink.slug.startswith(f"{base}-", autoescape=True)
+    )))).one()
+    if not taken:
+        return base
+    return f"{base}-{(highest or 0) + 1 + (random.randrange(spread) if spread else 0)}"
+
+def link_fingerprint(link: SchedulingLink) -> tuple:
+    """The link columns public responses depend on. Custom questions are only
+    written together with their link, so they're covered by updated_at."""
+    return (
+        link.id, link.slug, link.title, link.meeting_length,
+        link.buffer_before, link.buffer_after, link.created_at, link.updated_at
+    )
+
+def select_links():
+    """SchedulingLink query with custom questions loaded up front, as responses always include them."""
+    return select(SchedulingLink).options(selectinload(SchedulingLink.custom_questions))
+
 @router.post("/", response_model=SchedulingLinkResponse)
-def create_scheduling_link(
+async def create_scheduling_link(
     scheduling_link: SchedulingLinkCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
+    if scheduling_link.slug and scheduling_link.slug.isdigit():
+        raise HTTPException(status_code=400, detail="Slug must contain a non-digit character")
     # Generate slug if not provided
-    if not scheduling_link.slug:
-        scheduling_link.slug = generate_slug(scheduling_link.title)
-    
-    # Check if slug already exists
-    existing_link = db.query(SchedulingLink).filter(SchedulingLink.slug == scheduling_link.slug).first()
-    if existing_link:
-        # Append a number to make it unique
-        counter = 1
-        while existing_link:
-            new_slug = f"{scheduling_link.slug}-{counter}"
-            existing_link = db.query(SchedulingLink).filter(SchedulingLink.slug == new_slug).first()
-            counter += 1
-        scheduling_link.slug = new_slug
-
-    db_scheduling_link = SchedulingLink(
-        user_id=current_user.id,
-        title=scheduling_link.title,
-        slug=scheduling_link.slug,
-        meeting_length=scheduling_link.meeting_length,
-        buffer_before=scheduling_link.buffer_before,
-        buffer_after=scheduling_link.buffer_after
-    )
-    db.add(db_scheduling_link)
-    db.flush()  # Flush to get the ID
+    base_slug = scheduling_link.slug or generate_slug(scheduling_link.title)
+
+    # The unique index on slug is the arbiter: a concurrent create can take
+    # the slug between our read and insert, so retry with a fresh one
+    for attempt in range(SLUG_MAX_ATTEMPTS):
+        db_scheduling_link = SchedulingLink(
+            user_id=current_user.id,
+            title=scheduling_link.title,
+            slug=await next_free_slug(db, base_slug, spread=attempt),
+            meeting_length=scheduling_link.meeting_length,
+            buffer_before=scheduling_link.buffer_before,
+            buffer_after=scheduling_link.buffer_after
+        )
+        try:
+            async with db.begin_nested():
+                db.add(db_scheduling_link)  # Flushed on exit to get the ID
+            break
+        except IntegrityError as e:
+            if SLUG_INDEX not in str(e.orig):
+                raise
+    else:
+        raise HTTPException(status_code=409, detail="Could not allocate a unique slug, please retry")
 
     # Create custom questions
     for question in scheduling_link.custom_questions:
@@ -64,145 +126,341 @@ def create_scheduling_link(
         )
         db.add(db_question)
 
-    db.commit()
-    db.refresh(db_scheduling_link)
-    return db_scheduling_link
+    await db.commit()
+    return await db.scalar(select_links().where(SchedulingLink.id == db_scheduling_link.id))
 
 @router.get("/", response_model=List[SchedulingLinkResponse])
-def list_scheduling_links(
-    db: Session = Depends(get_db),
+async def list_scheduling_links(
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    return db.query(SchedulingLink).filter(SchedulingLink.user_id == current_user.id).all()
+    return await paginate(
+        db, SchedulingLink, page, SchedulingLink.user_id == current_user.id,
+        schema=SchedulingLinkResponse, options=[selectinload(SchedulingLink.custom_questions)]
+    )
 
-@router.get("/{scheduling_link_id}", response_model=SchedulingLinkResponse)
-def get_scheduling_link(
+@router.get("/availability", response_model=Dict[int, Dict[str, List[str]]])
+async def get_bulk_availability(
+    tz: str = "UTC",
+    start_date: Optional[date] = None,
+    days: int = Query(30, ge=1, le=AVAILABILITY_MAX_DAYS),
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Free slots for every scheduling link the current user owns, in one call."""
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+    if start_date is None:
+        start_date = datetime.now(zone).date()
+
+    links = (await db.execute(select(
+        SchedulingLink.id,
+        SchedulingLink.meeting_length,
+        SchedulingLink.buffer_before,
+        SchedulingLink.buffer_after
+    ).where(SchedulingLink.user_id == current_user.id))).all()
+
+    range_start = datetime.combine(start_date, time.min, tzinfo=zone)
+    range_end = datetime.combine(start_date + timedelta(days=days), time.min, tzinfo=zone)
+    start = availability.to_minutes(range_start)
+    end = availability.to_minutes(range_end)
+    now = availability.to_minutes(datetime.now(pytz.UTC))
+    if not links or end <= now:
+        return {link.id: {} for link in links}
+
+    template = await weekly_templates.get(db, current_user.id)
+    windows = expand_template(template, start, end)
+    if not windows:
+        return {link.id: {} for link in links}
+    # Whole windows can run past the range, and buffers reach beyond the slots
+    busy_start = start - max(link.buffer_before or 0 for link in links)
+    busy_end = max(end, windows[-1][1]) + max(link.buffer_after or 0 for link in links)
+    busy = await run_in_session(
+        get_busy_intervals,
+        current_user.id,
+        availability.from_minutes(busy_start),
+        availability.from_minutes(busy_end)
+    )
+
+    def compute():
+        slots = bulk_availability.bulk_free_slots(
+            bulk_availability.to_array(windows),
+            bulk_availability.to_array(busy),
+            [(link.id, link.meeting_length, link.buffer_before or 0, link.buffer_after or 0) for link in links]
+        )
+        offsets = bulk_availability.OffsetTable(zone, start, end)
+        return {
+            # Same trimming as get_available_slots, so the two agree
+            link_id: bulk_availability.format_slots(availability.slots_between(starts, max(start, now), end), offsets)
+            for link_id, starts in slots.items()
+        }
+
+    # CPU-bound for long horizons, so keep it off the event loop
+    return await run_in_threadpool(compute)
+
+# The :int convertor lets non-numeric paths fall through to the slug route
+@router.get("/{scheduling_link_id:int}", response_model=SchedulingLinkResponse)
+async def get_scheduling_link(
     scheduling_link_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    scheduling_link = db.query(SchedulingLink).filter(
+    scheduling_link = await db.scalar(select_links().where(
         SchedulingLink.id == scheduling_link_id,
         SchedulingLink.user_id == current_user.id
-    ).first()
+    ))
     if not scheduling_link:
         raise HTTPException(status_code=404, detail="Scheduling link not found")
     return scheduling_link
 
 @router.delete("/{scheduling_link_id}")
-def delete_scheduling_link(
+async def delete_scheduling_link(
     scheduling_link_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
-    scheduling_link = db.query(SchedulingLink).filter(
+    scheduling_link = await db.scalar(select(SchedulingLink).where(
         SchedulingLink.id == scheduling_link_id,
         SchedulingLink.user_id == current_user.id
-    ).first()
+    ))
     if not scheduling_link:
         raise HTTPException(status_code=404, detail="Scheduling link not found")
-    db.delete(scheduling_link)
-    db.commit()
+    slug = scheduling_link.slug
+    await db.delete(scheduling_link)
+    await db.commit()
+    await public_cache.delete(f"link:{slug}")
     return {"message": "Scheduling link deleted"}
 
-@router.get("/{slug}", response_model=SchedulingLinkResponse)
-def get_scheduling_link_by_slug(slug: str, db: Session = Depends(get_db)):
-    scheduling_link = db.query(SchedulingLink).filter(SchedulingLink.slug == slug).first()
-    if not scheduling_link:
-        raise HTTPException(status_code=404, detail="Scheduling link not found")
-    return scheduling_link
+@router.get("/{slug}", response_model=SchedulingLinkResponse, dependencies=[Depends(rate_limit("link", "slug"))])
+async def get_scheduling_link_by_slug(
+    slug: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    # Served from the shared cache for up to LINK_MAX_AGE_SECONDS, the same
+    # staleness clients already accept through Cache-Control
+    entry = await public_cache.get(f"link:{slug}")
+    if entry is None:
+        scheduling_link = await db.scalar(
+            select(SchedulingLink).where(SchedulingLink.slug == slug).options(selectinload(SchedulingLink.custom_questions))
+        )
+        if not scheduling_link:
+            raise HTTPException(status_code=404, detail="Scheduling link not found")
+        entry = {
+            "etag": make_etag(link_fingerprint(scheduling_link)),
+            "body": SchedulingLinkResponse.model_validate(scheduling_link).model_dump(mode="json")
+        }
+        await public_cache.set(f"link:{slug}", entry, ttl_seconds=LINK_MAX_AGE_SECONDS)
+
+    cached = not_modified(request, entry["etag"], LINK_MAX_AGE_SECONDS)
+    if cached:
+        return cached
+    return JSONResponse(entry["body"], headers=cache_headers(entry["etag"], LINK_MAX_AGE_SECONDS))
+
+def booked_intervals(db: Session, user_id: int, start: datetime, end: datetime) -> List[availability.Interval]:
+    """Meetings already booked with a user that overlap a range."""
+    rows = db.query(Meeting.meeting_time, Meeting.end_time).filter(
+        Meeting.user_id == user_id,
+        Meeting.meeting_time < end,
+        Meeting.end_time > start
+    ).all()
+    return [(availability.to_minutes(meeting_start), availability.to_minutes(meeting_end)) for meeting_start, meeting_end in rows]
+
+def get_busy_intervals(db: Session, user_id: int, start: datetime, end: datetime) -> List[availability.Interval]:
+    """Get a user's busy time for a range, with calendar busy time from the cache when possible.
+
+    Bookings are read fresh every time: busy_cache is per process, so a
+    booking made on another worker would be missing from its entries.
+    """
+    cache_start = availability.to_minutes(start)
+    cache_end = availability.to_minutes(end)
+    busy = busy_cache.get(user_id, cache_start, cache_end)
+    if busy is None:
+        generation = busy_cache.generation(user_id)
+        busy, errors = load_busy_intervals(db, user_id, start, end)
+        # Don't cache busy time that is missing a calendar
+        if not errors:
+            busy_cache.set(user_id, cache_start, cache_end, busy, generation)
+    return availability.merge_intervals(busy + booked_intervals(db, user_id, start, end))
+
+def stream_available_slots(
+    user_id: int,
+    template: array,
+    zone: ZoneInfo,
+    start_date: date,
+    days: int,
+    meeting_length: int,
+    buffer_before: int,
+    buffer_after: int
+) -> Iterator[str]:
+    """Yield the available-slots JSON object one page of days at a time.
+
+    Pages are whole days in the invitee's timezone, so busy time is cached
+    per page and a long horizon never holds more than one page in memory.
+    The session's connection is only checked out while a page is computed.
+    """
+    db = SessionLocal()
+    try:
+        now = availability.to_minutes(datetime.now(pytz.UTC))
+        first = True
+        yield "{"
+        for offset in range(0, days, AVAILABILITY_PAGE_DAYS):
+            page_start = datetime.combine(start_date + timedelta(days=offset), time.min, tzinfo=zone)
+            page_end = datetime.combine(
+                start_date + timedelta(days=min(offset + AVAILABILITY_PAGE_DAYS, days)),
+                time.min,
+                tzinfo=zone
+            )
+            start = availability.to_minutes(page_start)
+            end = availability.to_minutes(page_end)
+            if end <= now:
+                continue
 
-@router.get("/{link_id}/available-slots", response_model=Dict[str, List[str]])
-def get_available_slots(link_id: int, db: Session = Depends(get_db)):
+            windows = expand_template(template, start, end)
+            if not windows:
+                continue
+            # Whole windows can run past the page, and buffers reach beyond the slots
+            busy = get_busy_intervals(
+                db,
+                user_id,
+                availability.from_minutes(start - buffer_before),
+                availability.from_minutes(max(end, windows[-1][1]) + buffer_after)
+            )
+            slots = availability.free_slots(
+                windows,
+                busy,
+                meeting_length,
+                buffer_before=buffer_before,
+                buffer_after=buffer_after
+            )
+            # Slots that have started drop out; the grid stays on the window starts
+            slots = availability.slots_between(slots, max(start, now), end)
+            # The page is sent at the client's pace; give the connection back
+            # to the pool until the next page needs one
+            db.close()
+            for day, times in availability.group_slots_by_date(slots, zone).items():
+                yield ("" if first else ",") + json.dumps(day) + ":" + json.dumps(times)
+                first = False
+        yield "}"
+    finally:
+        db.close()
+
+@router.get(
+    "/{link_id}/available-slots",
+    response_model=Dict[str, List[str]],
+    dependencies=[Depends(rate_limit("slots", "link_id"))]
+)
+async def get_available_slots(
+    link_id: int,
+    request: Request,
+    tz: str = "UTC",
+    start_date: Optional[date] = None,
+    days: int = Query(7, ge=1, le=AVAILABILITY_MAX_DAYS),
+    db: AsyncSession = Depends(get_db)
+):
+    """List free slots for ``days`` days from ``start_date``, with dates and times in the invitee's ``tz``."""
     # Get the scheduling link
-    scheduling_link = db.query(SchedulingLink).filter(SchedulingLink.id == link_id).first()
+    scheduling_link = await db.get(SchedulingLink, link_id)
     if not scheduling_link:
         raise HTTPException(status_code=404, detail="Scheduling link not found")
 
-    # Get scheduling windows for the next 7 days
-    start_date = datetime.now(pytz.UTC).date()
-    end_date = start_date + timedelta(days=7)
-    
-    windows = db.query(SchedulingWindow).filter(
-        SchedulingWindow.user_id == scheduling_link.user_id,
-        SchedulingWindow.day_of_week >= start_date.weekday(),
-        SchedulingWindow.day_of_week < end_date.weekday() + 7
-    ).all()
+    try:
+        zone = ZoneInfo(tz)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {tz}")
+    if start_date is None:
+        start_date = datetime.now(zone).date()
+
+    template = await weekly_templates.get(db, scheduling_link.user_id)
 
-    # Get Google Calendar events
-    events = get_events(scheduling_link.user_id, start_date, end_date)
-
-    # Generate available slots
-    available_slots = {}
-    current_date = start_date
-    while current_date <= end_date:
-        day_windows = [w for w in windows if w.day_of_week == current_date.weekday()]
-        if day_windows:
-            slots = []
-            for window in day_windows:
-                start_time = datetime.strptime(window.start_hour, "%H:%M").time()
-                end_time = datetime.strptime(window.end_hour, "%H:%M").time()
-                
-                current_time = start_time
-                while current_time < end_time:
-                    slot_start = datetime.combine(current_date, current_time)
-                    slot_end = slot_start + timedelta(minutes=scheduling_link.meeting_length)
-                    
-                    # Check if slot overlaps with any events
-                    slot_available = True
-                    for event in events:
-                        event_start = event['start'].get('dateTime', event['start'].get('date'))
-                        event_end = event['end'].get('dateTime', event['end'].get('date'))
-                        
-                        if isinstance(event_start, str):
-                            event_start = datetime.fromisoformat(event_start.replace('Z', '+00:00'))
-                        if isinstance(event_end, str):
-                            event_end = datetime.fromisoformat(event_end.replace('Z', '+00:00'))
-                        
-                        if (slot_start < event_end and slot_end > event_start):
-                            slot_available = False
-                            break
-                    
-                    if slot_available:
-                        slots.append(current_time.strftime("%H:%M"))
-                    
-                    # Move to next slot
-                    current_time = (datetime.combine(current_date, current_time) + 
-                                  timedelta(minutes=scheduling_link.meeting_length)).time()
-            
-            if slots:
-                available_slots[current_date.isoformat()] = slots
-        
-        current_date += timedelta(days=1)
-
-    return available_slots
-
-@router.post("/{slug}/book", status_code=status.HTTP_201_CREATED)
-def book_meeting(
+    # Built only from state every worker shares: the link, the windows' and
+    # the busy data's versions, and the busy-cache TTL bucket so calendar
+    # changes pulled in by a sync show up. Slots starting in the meantime
+    # are covered by max-age rather than by the tag.
+    etag = make_etag(
+        link_fingerprint(scheduling_link),
+        tz, start_date, days,
+        weekly_templates.version(scheduling_link.user_id),
+        await availability_version(db, scheduling_link.user_id),
+        int(datetime.now(pytz.UTC).timestamp() // busy_cache.ttl_seconds)
+    )
+    cached = not_modified(request, etag, AVAILABILITY_MAX_AGE_SECONDS)
+    if cached:
+        return cached
+
+    # Iterated on the threadpool, so profiled step by step
+    slots = profile_iterator(stream_available_slots(
+        scheduling_link.user_id,
+        template,
+        zone,
+        start_date,
+        days,
+        scheduling_link.meeting_length,
+        scheduling_link.buffer_before or 0,
+        scheduling_link.buffer_after or 0
+    ))
+    if days > AVAILABILITY_CACHE_MAX_DAYS:
+        # The generator does blocking work, so Starlette iterates it on the threadpool
+        return StreamingResponse(
+            slots,
+            media_type="application/json",
+            headers=cache_headers(etag, AVAILABILITY_MAX_AGE_SECONDS)
+        )
+
+    # Workers share computed bodies, so a scraper spread across them still
+    # costs one busy-time load per link and ETag
+    body_key = "slots:" + etag.strip('"')
+    body = await public_cache.get(body_key)
+    if body is None:
+        body = await run_in_threadpool(lambda: "".join(slots))
+        await public_cache.set(body_key, body, ttl_seconds=AVAILABILITY_MAX_AGE_SECONDS)
+    return Response(body, media_type="application/json", headers=cache_headers(etag, AVAILABILITY_MAX_AGE_SECONDS))
+
+@router.post("/{slug}/book", status_code=status.HTTP_201_CREATED, dependencies=[Depends(rate_limit("book", "slug"))])
+async def book_meeting(
     slug: str,
     booking: BookingCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Get the scheduling link
-    scheduling_link = db.query(SchedulingLink).filter(SchedulingLink.slug == slug).first()
+    scheduling_link = await db.scalar(select(SchedulingLink).where(SchedulingLink.slug == slug))
     if not scheduling_link:
         raise HTTPException(status_code=404, detail="Scheduling link not found")
 
-    # Create the meeting
+    meeting_time = booking.meeting_time
+    if meeting_time.tzinfo is None:
+        meeting_time = meeting_time.replace(tzinfo=pytz.UTC)
+
+    # Create the meeting. meetings_no_overlap rejects it if the advisor was
+    # booked for an overlapping time in the meantime; the check only takes
+    # locks on this advisor's rows, so other advisors' bookings never wait.
     meeting = Meeting(
         user_id=scheduling_link.user_id,
         scheduling_link_id=scheduling_link.id,
         email=booking.email,
-        linkedin_url=booking.linkedin_url,
-        meeting_time=booking.meeting_time,
+        linkedin_url=str(booking.linkedin_url),
+        meeting_time=meeting_time,
+        end_time=meeting_time + timedelta(minutes=scheduling_link.meeting_length),
         answers=booking.answers
     )
     db.add(meeting)
-    db.commit()
-    db.refresh(meeting)
+    try:
+        await db.flush()
+    except IntegrityError as e:
+        await db.rollback()
+        if MEETING_OVERLAP_CONSTRAINT not in str(e.orig):
+            raise
+        raise HTTPException(status_code=409, detail="This time is no longer available")
 
-    # TODO: Create Google Calendar event
-    # TODO: Send confirmation emails
-    # TODO: Create HubSpot contact
+    # Calendar event, confirmation emails and HubSpot contact run on the job
+    # workers; queued in this transaction so they exist iff the booking does
+    await enqueue_booking_side_effects(db, meeting.id, scheduling_link.user_id)
+    await db.commit()
+    # Bookings are never in busy_cache, but the ETags and cached bodies of
+    # every worker have to change
+    await bump_availability_version(db, scheduling_link.user_id)
 
-    return {"message": "Meeting booked successfully"} 
\ No newline at end of file
+    return {"message": "Meeting booked successfully", "meeting_id": meeting.id} 
\ No newline at end of file
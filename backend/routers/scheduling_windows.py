@@ -1,25 +1,27 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import datetime
 
 from database import get_db
 from models import SchedulingWindow
 from schemas.scheduling_window import SchedulingWindowCreate, SchedulingWindowResponse
+from services.weekly_template import weekly_templates
+from pagination import PageParams, paginate
 
 router = APIRouter(prefix="/api/scheduling-windows", tags=["scheduling-windows"])
 
 @router.get("/", response_model=List[SchedulingWindowResponse])
-async def list_scheduling_windows(db: Session = Depends(get_db)):
+async def list_scheduling_windows(page: PageParams = Depends(), db: AsyncSession = Depends(get_db)):
     """List all scheduling windows for the current user."""
     # Temporarily hardcoded user_id until auth is implemented
-    windows = db.query(SchedulingWindow).filter(SchedulingWindow.user_id == 1).all()
-    return windows
+    return await paginate(db, SchedulingWindow, page, SchedulingWindow.user_id == 1, schema=SchedulingWindowResponse)
 
 @router.post("/", response_model=SchedulingWindowResponse)
 async def create_scheduling_window(
     window: SchedulingWindowCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new scheduling window."""
     print(f"Creating scheduling window: {window}")
@@ -38,7 +40,7 @@ async def create_scheduling_window(
             raise HTTPException(status_code=400, detail="Start hour must be before end hour")
         
         # Check for overlapping windows
-        existing_window = db.query(SchedulingWindow).filter(
+        existing_window = await db.scalar(select(SchedulingWindow).where(
             SchedulingWindow.user_id == 1,
             SchedulingWindow.day_of_week == window.day_of_week,
             (
@@ -48,7 +50,7 @@ async def create_scheduling_window(
                 (SchedulingWindow.start_hour < window.end_hour) & 
                 (SchedulingWindow.end_hour >= window.end_hour)
             )
-        ).first()
+        ).limit(1))
         
         if existing_window:
             print(f"Found overlapping window: {existing_window}")
@@ -67,17 +69,18 @@ async def create_scheduling_window(
         
         try:
             db.add(db_window)
-            db.commit()
-            db.refresh(db_window)
+            await db.commit()
+            await db.refresh(db_window)
             # Ensure updated_at is set
             if db_window.updated_at is None:
                 db_window.updated_at = db_window.created_at
-                db.commit()
-                db.refresh(db_window)
+                await db.commit()
+                await db.refresh(db_window)
             print(f"Created scheduling window: {db_window}")
+            await weekly_templates.rebuild(db, 1)
             return db_window
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             print(f"Database error: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except ValueError:
@@ -86,21 +89,22 @@ async def create_scheduling_window(
         raise
     except Exception as e:
         print(f"Error creating scheduling window: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating scheduling window: {str(e)}")
 
 @router.delete("/{window_id}")
-async def delete_scheduling_window(window_id: int, db: Session = Depends(get_db)):
+async def delete_scheduling_window(window_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a scheduling window."""
-    window = db.query(SchedulingWindow).filter(
+    window = await db.scalar(select(SchedulingWindow).where(
         SchedulingWindow.id == window_id,
         SchedulingWindow.user_id == 1  # Temporarily hardcoded until auth is implemented
-    ).first()
+    ))
     
     if not window:
         raise HTTPException(status_code=404, detail="Scheduling window not found")
     
-    db.delete(window)
-    db.commit()
+    await db.delete(window)
+    await db.commit()
+    await weekly_templates.rebuild(db, 1)
     
     return {"message": "Scheduling window deleted"} 
\ No newline at end of file
@@ -1,3 +1,4 @@
 # This file makes the schemas directory a Python package
 from .google_calendar import GoogleCalendarResponse, GoogleCalendarEvent
-from .scheduling_window import SchedulingWindowCreate, SchedulingWindowResponse 
\ No newline at end of file
+from .scheduling_window import SchedulingWindowCreate, SchedulingWindowResponse 
+from .meeting import MeetingResponse
\ No newline at end of file
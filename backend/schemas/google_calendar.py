@@ -15,6 +15,8 @@ class GoogleCalendarResponse(BaseModel):
     email: str
     created_at: datetime
     user_id: int
+    # Reconnect through /auth/google/auth so bookings can create events
+    needs_reconsent: bool
 
     class Config:
         from_attributes = True 
\ No newline at end of file
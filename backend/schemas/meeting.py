@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Dict, Optional
+from datetime import datetime
+
+class MeetingResponse(BaseModel):
+    id: int
+    user_id: int
+    scheduling_link_id: int
+    email: str
+    linkedin_url: Optional[str] = None
+    meeting_time: datetime
+    answers: Optional[Dict[str, str]] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
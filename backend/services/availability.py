@@ -0,0 +1,183 @@
+"""Interval-based availability engine.
+
+All times are represented as integer minutes since the Unix epoch (UTC) and
+all intervals are half-open ``[start, end)``. Windows and busy time are
+normalized once into sorted, merged interval lists, and free slots are then
+produced with a single linear sweep over both lists.
+"""
+from bisect import bisect_left
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Interval = Tuple[int, int]
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_hhmm(value: str) -> int:
+    """Convert an "HH:MM" string to minutes after midnight."""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def to_minutes(value: datetime) -> int:
+    """Convert a datetime to minutes since the epoch. Naive values are treated as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int((value - EPOCH).total_seconds() // 60)
+
+
+def from_minutes(value: int) -> datetime:
+    """Convert minutes since the epoch back to an aware UTC datetime."""
+    return EPOCH + timedelta(minutes=value)
+
+
+def to_rfc3339(value: datetime) -> str:
+    """Format a datetime for the Calendar API. Naive values are treated as UTC."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def date_to_minutes(value: date) -> int:
+    """Minutes since the epoch at UTC midnight of the given date."""
+    return (value - EPOCH.date()).days * MINUTES_PER_DAY
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort intervals and merge the ones that overlap or touch."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def clip_intervals(intervals: Iterable[Interval], start: int, end: int) -> List[Interval]:
+    """Restrict sorted intervals to ``[start, end)``."""
+    clipped: List[Interval] = []
+    for interval_start, interval_end in intervals:
+        interval_start = max(interval_start, start)
+        interval_end = min(interval_end, end)
+        if interval_start < interval_end:
+            clipped.append((interval_start, interval_end))
+    return clipped
+
+
+def window_intervals(
+    windows: Iterable[Tuple[int, str, str]],
+    start_date: date,
+    end_date: date
+) -> List[Interval]:
+    """Expand weekly (day_of_week, "HH:MM", "HH:MM") windows over a date range (inclusive)."""
+    by_weekday: Dict[int, List[Tuple[int, int]]] = {}
+    for day_of_week, start_hour, end_hour in windows:
+        by_weekday.setdefault(day_of_week, []).append((parse_hhmm(start_hour), parse_hhmm(end_hour)))
+
+    intervals: List[Interval] = []
+    current_date = start_date
+    while current_date <= end_date:
+        day_start = date_to_minutes(current_date)
+        for start, end in by_weekday.get(current_date.weekday(), ()):
+            intervals.append((day_start + start, day_start + end))
+        current_date += timedelta(days=1)
+    return merge_intervals(intervals)
+
+
+def parse_event_time(value: dict) -> Optional[datetime]:
+    """Parse a Google event's start or end. All-day dates become UTC midnight."""
+    raw = value.get("dateTime", value.get("date"))
+    if raw is None:
+        return None
+    return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+
+
+def event_intervals(events: Iterable[dict]) -> List[Interval]:
+    """Parse Google Calendar events into merged busy intervals, once per event."""
+    intervals: List[Interval] = []
+    for event in events:
+        start = parse_event_time(event.get("start", {}))
+        end = parse_event_time(event.get("end", {}))
+        if start is None or end is None:
+            continue
+        intervals.append((to_minutes(start), to_minutes(end)))
+    return merge_intervals(intervals)
+
+
+def freebusy_intervals(response: dict) -> List[Interval]:
+    """Merge the busy periods of a freeBusy query response.
+
+    Raises if Google could not answer for one of the requested calendars,
+    so the caller never mistakes missing data for free time.
+    """
+    intervals: List[Interval] = []
+    for calendar_id, calendar in response.get("calendars", {}).items():
+        if calendar.get("errors"):
+            reasons = ", ".join(error.get("reason", "unknown") for error in calendar["errors"])
+            raise RuntimeError(f"freeBusy failed for {calendar_id}: {reasons}")
+        for period in calendar.get("busy", []):
+            intervals.append((to_minutes(parse_event_time({"dateTime": period["start"]})),
+                              to_minutes(parse_event_time({"dateTime": period["end"]}))))
+    return merge_intervals(intervals)
+
+
+def free_slots(
+    windows: Sequence[Interval],
+    busy: Sequence[Interval],
+    meeting_length: int,
+    buffer_before: int = 0,
+    buffer_after: int = 0,
+    step: Optional[int] = None
+) -> List[int]:
+    """Return the start minute of every free slot.
+
+    ``windows`` and ``busy`` must be sorted and merged (see ``merge_intervals``).
+    Slots start at each window's start and advance by ``step`` (the meeting
+    length by default). A slot is free when the meeting fits inside its window
+    and the meeting plus its buffers does not overlap any busy interval.
+    """
+    step = step or meeting_length
+    slots: List[int] = []
+    j = 0
+    for window_start, window_end in windows:
+        slot_start = window_start
+        while slot_start + meeting_length <= window_end:
+            blocked_start = slot_start - buffer_before
+            blocked_end = slot_start + meeting_length + buffer_after
+            # Busy intervals that end before this slot can never block a later one
+            while j < len(busy) and busy[j][1] <= blocked_start:
+                j += 1
+            if j == len(busy) or busy[j][0] >= blocked_end:
+                slots.append(slot_start)
+            slot_start += step
+    return slots
+
+
+def slots_between(slots: Sequence[int], start: int, end: int) -> Sequence[int]:
+    """The sorted ``slots`` that start in ``[start, end)``.
+
+    Trim slots with this rather than clipping windows, which would move the
+    slot grid off the window starts. Slices, so lists and NumPy arrays both work.
+    """
+    return slots[bisect_left(slots, start):bisect_left(slots, end)]
+
+
+def group_slots_by_date(slots: Iterable[int], zone: Optional[tzinfo] = None) -> Dict[str, List[str]]:
+    """Group slot start minutes into {"YYYY-MM-DD": ["HH:MM", ...]}, in ``zone`` if given."""
+    grouped: Dict[str, List[str]] = {}
+    if zone is not None:
+        for slot in slots:
+            local = from_minutes(slot).astimezone(zone)
+            grouped.setdefault(local.date().isoformat(), []).append(local.strftime("%H:%M"))
+        return grouped
+    for slot in slots:
+        day, minute = divmod(slot, MINUTES_PER_DAY)
+        key = (EPOCH.date() + timedelta(days=day)).isoformat()
+        grouped.setdefault(key, []).append(f"{minute // 60:02d}:{minute % 60:02d}")
+    return grouped
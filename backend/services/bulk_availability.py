@@ -0,0 +1,117 @@
+"""Vectorized slot generation for many scheduling links over long horizons.
+
+Windows and busy time are held as ``(n, 2)`` int64 NumPy arrays of epoch
+minutes. For each link, every candidate slot start is generated at once
+and checked against busy time with one ``searchsorted``, so cost no longer
+grows with Python-level loops over days and slots. Links that share a
+meeting length and buffers share one computation.
+"""
+from datetime import timedelta, tzinfo
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.availability import EPOCH, MINUTES_PER_DAY, Interval, from_minutes
+
+QUARTERS_PER_DAY = MINUTES_PER_DAY // 15
+HHMM = [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(MINUTES_PER_DAY)]
+
+# (key, meeting_length, buffer_before, buffer_after)
+LinkSpec = Tuple[Hashable, int, int, int]
+
+
+def to_array(intervals: Sequence[Interval]) -> np.ndarray:
+    return np.asarray(intervals, dtype=np.int64).reshape(-1, 2)
+
+
+def candidate_starts(windows: np.ndarray, meeting_length: int, step: int) -> np.ndarray:
+    """Every slot start that fits a meeting inside its window, for all windows at once."""
+    lengths = windows[:, 1] - windows[:, 0] - meeting_length
+    counts = np.where(lengths >= 0, lengths // step + 1, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    # Position of each slot within its own window
+    offsets = np.arange(total, dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(windows[:, 0], counts) + offsets * step
+
+
+def free_mask(
+    starts: np.ndarray,
+    busy: np.ndarray,
+    meeting_length: int,
+    buffer_before: int = 0,
+    buffer_after: int = 0
+) -> np.ndarray:
+    """True for each start whose meeting plus buffers overlaps no busy interval.
+
+    ``busy`` must be sorted and merged, so its end column is sorted too.
+    """
+    if len(busy) == 0:
+        return np.ones(len(starts), dtype=bool)
+    # First busy interval that ends after the blocked range starts
+    index = np.searchsorted(busy[:, 1], starts - buffer_before, side="right")
+    in_range = index < len(busy)
+    blocking_start = busy[np.minimum(index, len(busy) - 1), 0]
+    return ~(in_range & (blocking_start < starts + meeting_length + buffer_after))
+
+
+def bulk_free_slots(
+    windows: np.ndarray,
+    busy: np.ndarray,
+    links: Sequence[LinkSpec]
+) -> Dict[Hashable, np.ndarray]:
+    """Free slot starts for many links over the same windows and busy time."""
+    by_spec: Dict[Tuple[int, int, int], np.ndarray] = {}
+    slots: Dict[Hashable, np.ndarray] = {}
+    for key, meeting_length, buffer_before, buffer_after in links:
+        spec = (meeting_length, buffer_before, buffer_after)
+        if spec not in by_spec:
+            starts = candidate_starts(windows, meeting_length, meeting_length)
+            by_spec[spec] = starts[free_mask(starts, busy, meeting_length, buffer_before, buffer_after)]
+        slots[key] = by_spec[spec]
+    return slots
+
+
+def _utc_offset(minute: int, zone: tzinfo) -> int:
+    return from_minutes(minute).astimezone(zone).utcoffset() // timedelta(minutes=1)
+
+
+class OffsetTable:
+    """Offsets in minutes from UTC to ``zone``, one per quarter hour of a range.
+
+    Only days whose offset changes (DST transitions) are converted quarter
+    hour by quarter hour; every other day costs a single conversion. Build
+    one table per request and share it across links.
+    """
+
+    def __init__(self, zone: tzinfo, start: int, end: int):
+        self.start = start - start % MINUTES_PER_DAY
+        days = (end - self.start) // MINUTES_PER_DAY + 1
+        day_offsets = [_utc_offset(self.start + day * MINUTES_PER_DAY, zone) for day in range(days + 1)]
+        self.quarters = np.repeat(np.array(day_offsets[:-1], dtype=np.int64), QUARTERS_PER_DAY)
+        for day in range(days):
+            if day_offsets[day] != day_offsets[day + 1]:
+                day_start = self.start + day * MINUTES_PER_DAY
+                self.quarters[day * QUARTERS_PER_DAY:(day + 1) * QUARTERS_PER_DAY] = [
+                    _utc_offset(day_start + quarter * 15, zone) for quarter in range(QUARTERS_PER_DAY)
+                ]
+
+    def lookup(self, starts: np.ndarray) -> np.ndarray:
+        return self.quarters[(starts - self.start) // 15]
+
+
+def format_slots(starts: np.ndarray, offsets: Optional[OffsetTable] = None) -> Dict[str, List[str]]:
+    """Group sorted slot starts into {"YYYY-MM-DD": ["HH:MM", ...]}, shifted by ``offsets`` if given."""
+    local = starts + offsets.lookup(starts) if offsets is not None and len(starts) else starts
+    days, minutes = np.divmod(local, MINUTES_PER_DAY)
+    grouped: Dict[str, List[str]] = {}
+    if len(local) == 0:
+        return grouped
+    unique_days, first_index = np.unique(days, return_index=True)
+    bounds = list(first_index) + [len(local)]
+    epoch_date = EPOCH.date()
+    for i, day in enumerate(unique_days):
+        key = (epoch_date + timedelta(days=int(day))).isoformat()
+        grouped[key] = [HHMM[minute] for minute in minutes[bounds[i]:bounds[i + 1]].tolist()]
+    return grouped
@@ -0,0 +1,80 @@
+"""In-process LRU cache of each user's busy intervals.
+
+Entries are keyed by (user_id, range_start, range_end) in epoch minutes and
+expire after a TTL. ``invalidate`` drops everything cached for a user and
+bumps that user's generation counter, so callers can tell that busy time
+may have changed.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from services.availability import Interval
+
+CacheKey = Tuple[int, int, int]
+
+BUSY_CACHE_TTL_SECONDS = float(os.getenv("BUSY_CACHE_TTL_SECONDS", "120"))
+BUSY_CACHE_MAX_ENTRIES = int(os.getenv("BUSY_CACHE_MAX_ENTRIES", "1024"))
+
+
+class BusyIntervalCache:
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Tuple[float, List[Interval]]]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, start: int, end: int) -> Optional[List[Interval]]:
+        """Return cached busy intervals, or None on a miss or an expired entry."""
+        key = (user_id, start, end)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, intervals = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return intervals
+
+    def set(
+        self,
+        user_id: int,
+        start: int,
+        end: int,
+        intervals: List[Interval],
+        generation: Optional[int] = None
+    ) -> None:
+        """Cache busy intervals. Pass the ``generation`` read before loading to
+        skip the write if the user was invalidated in the meantime."""
+        key = (user_id, start, end)
+        with self._lock:
+            if generation is not None and self._generations.get(user_id, 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, intervals)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop every cached range for a user and bump their generation."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def generation(self, user_id: int) -> int:
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+busy_cache = BusyIntervalCache(BUSY_CACHE_TTL_SECONDS, BUSY_CACHE_MAX_ENTRIES)
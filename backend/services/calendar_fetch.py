@@ -0,0 +1,82 @@
+"""Concurrent fan-out for per-calendar Google API calls.
+
+Each connected calendar is fetched on a bounded, shared thread pool, so a
+request waits for the slowest calendar instead of the sum of all of them.
+A calendar that fails or misses the deadline is reported in ``errors``
+while the others still contribute their events.
+"""
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence, Tuple
+
+from services.profiling import thread_profile
+
+GOOGLE_FETCH_WORKERS = int(os.getenv("GOOGLE_FETCH_WORKERS", "8"))
+GOOGLE_FETCH_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_FETCH_TIMEOUT_SECONDS", "10"))
+
+_executor = ThreadPoolExecutor(max_workers=GOOGLE_FETCH_WORKERS, thread_name_prefix="google-fetch")
+
+
+class FetchResult(NamedTuple):
+    events: List[dict]
+    errors: List[Dict[str, str]]
+
+
+def run_all(
+    jobs: Sequence[Tuple[str, Callable[[], Any]]],
+    timeout: float = GOOGLE_FETCH_TIMEOUT_SECONDS
+) -> Tuple[List[Any], List[Dict[str, str]]]:
+    """Run (calendar, job) pairs concurrently.
+
+    Returns the results of the jobs that succeeded, in job order, and an
+    error entry for each one that failed. Every job gets ``timeout`` seconds
+    measured from when it starts running, so jobs queued behind a full pool
+    are not penalised for the wait.
+    """
+    started: Dict[int, float] = {}
+
+    def run(index: int, job: Callable[[], Any]) -> Any:
+        started[index] = time.monotonic()
+        with thread_profile():
+            return job()
+
+    futures = [
+        # In the caller's context, so per-request metrics count the calls
+        (calendar, index, _executor.submit(contextvars.copy_context().run, run, index, job))
+        for index, (calendar, job) in enumerate(jobs)
+    ]
+
+    results: List[Any] = []
+    errors: List[Dict[str, str]] = []
+    for calendar, index, future in futures:
+        try:
+            while True:
+                start = started.get(index)
+                if start is None:
+                    # Still queued; wait for a worker without starting its clock
+                    remaining = timeout
+                else:
+                    remaining = max(0.0, start + timeout - time.monotonic())
+                try:
+                    results.append(future.result(timeout=remaining))
+                    break
+                except FutureTimeoutError:
+                    if start is not None:
+                        raise
+        except FutureTimeoutError:
+            future.cancel()
+            errors.append({"calendar": calendar, "error": f"Timed out after {timeout:g}s"})
+        except Exception as e:
+            errors.append({"calendar": calendar, "error": str(e)})
+    return results, errors
+
+
+def fetch_all(
+    jobs: Sequence[Tuple[str, Callable[[], List[dict]]]],
+    timeout: float = GOOGLE_FETCH_TIMEOUT_SECONDS
+) -> FetchResult:
+    """Run (calendar, fetch) jobs concurrently and collect their events."""
+    results, errors = run_all(jobs, timeout)
+    return FetchResult([event for events in results for event in events], errors)
@@ -0,0 +1,157 @@
+"""Incremental Google Calendar sync into the local ``calendar_events`` store.
+
+The first sync of a calendar lists its events from a short lookback up to
+a horizon and keeps the ``nextSyncToken`` Google returns. Every later sync
+sends that token and only receives the events that changed since, so
+refresh cost scales with changes rather than calendar size. The token keeps
+the first sync's time range, so a full sync runs again every
+CALENDAR_SYNC_RESYNC_DAYS to move the horizon forward. Availability then
+reads busy time straight from the store.
+"""
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional
+
+from googleapiclient.errors import HttpError
+from sqlalchemy.orm import Session
+
+from models import CalendarEvent, GoogleCalendar
+from services.availability import Interval, merge_intervals, parse_event_time, to_minutes, to_rfc3339
+
+CALENDAR_SYNC_INTERVAL_SECONDS = float(os.getenv("CALENDAR_SYNC_INTERVAL_SECONDS", "60"))
+CALENDAR_SYNC_LOOKBACK_DAYS = int(os.getenv("CALENDAR_SYNC_LOOKBACK_DAYS", "1"))
+# Open-ended recurring events expand to one instance per occurrence, so a
+# full sync stops here; keep it past AVAILABILITY_MAX_DAYS plus the resync interval
+CALENDAR_SYNC_HORIZON_DAYS = int(os.getenv("CALENDAR_SYNC_HORIZON_DAYS", "400"))
+CALENDAR_SYNC_RESYNC_DAYS = int(os.getenv("CALENDAR_SYNC_RESYNC_DAYS", "30"))
+CALENDAR_SYNC_PAGE_SIZE = 2500
+# Availability only needs these, so skip summaries, descriptions and attendees
+CALENDAR_SYNC_FIELDS = "items(id,status,start,end,transparency),nextPageToken,nextSyncToken"
+
+
+class CalendarChanges(NamedTuple):
+    calendar_id: int
+    items: List[dict]
+    next_sync_token: Optional[str]
+    full: bool
+    synced_until: Optional[datetime]  # End of a full sync's range
+
+
+def fetch_changes(service, calendar_id: int, sync_token: Optional[str]) -> CalendarChanges:
+    """List a calendar's changes since ``sync_token``, or everything if it is None.
+
+    Falls back to a full sync when Google reports the token as expired (410).
+    """
+    full = sync_token is None
+    synced_until = None
+    params = {
+        "calendarId": "primary",
+        "singleEvents": True,
+        "maxResults": CALENDAR_SYNC_PAGE_SIZE,
+        "fields": CALENDAR_SYNC_FIELDS
+    }
+    if full:
+        now = datetime.now(timezone.utc)
+        synced_until = now + timedelta(days=CALENDAR_SYNC_HORIZON_DAYS)
+        params["timeMin"] = to_rfc3339(now - timedelta(days=CALENDAR_SYNC_LOOKBACK_DAYS))
+        params["timeMax"] = to_rfc3339(synced_until)
+    else:
+        params["syncToken"] = sync_token
+
+    items: List[dict] = []
+    page_token = None
+    while True:
+        try:
+            response = service.events().list(pageToken=page_token, **params).execute()
+        except HttpError as e:
+            if e.resp.status == 410 and not full:
+                return fetch_changes(service, calendar_id, None)
+            raise
+        items.extend(response.get("items", []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return CalendarChanges(calendar_id, items, response.get("nextSyncToken"), full, synced_until)
+
+
+def apply_changes(
+    db: Session,
+    calendar: GoogleCalendar,
+    changes: CalendarChanges,
+    fetched_after: Optional[datetime]
+) -> int:
+    """Write fetched changes to the store and save the new sync token.
+
+    ``fetched_after`` is the calendar's ``synced_at`` from before the fetch.
+    Concurrent syncs of one calendar are serialized on its row; if another
+    sync landed while these changes were being fetched, they are dropped.
+    Returns the number of events that were added, updated or removed.
+    """
+    db.refresh(calendar, with_for_update=True)
+    if calendar.synced_at != fetched_after:
+        db.commit()
+        return 0
+
+    if changes.full:
+        db.query(CalendarEvent).filter(CalendarEvent.google_calendar_id == calendar.id).delete()
+        existing = {}
+    else:
+        event_ids = [item["id"] for item in changes.items]
+        existing = {
+            event.event_id: event
+            for event in db.query(CalendarEvent).filter(
+                CalendarEvent.google_calendar_id == calendar.id,
+                CalendarEvent.event_id.in_(event_ids)
+            )
+        } if event_ids else {}
+
+    now = datetime.now(timezone.utc)
+    for item in changes.items:
+        event = existing.get(item["id"])
+        start = parse_event_time(item.get("start", {}))
+        end = parse_event_time(item.get("end", {}))
+        if item.get("status") == "cancelled" or start is None or end is None:
+            if event is not None:
+                db.delete(event)
+            continue
+        if event is None:
+            event = CalendarEvent(google_calendar_id=calendar.id, event_id=item["id"])
+            db.add(event)
+            existing[item["id"]] = event
+        event.start_time = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+        event.end_time = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+        event.transparent = item.get("transparency") == "transparent"
+        event.updated_at = now
+
+    calendar.sync_token = changes.next_sync_token
+    calendar.synced_at = now
+    if changes.full:
+        calendar.synced_until = changes.synced_until
+    db.commit()
+    return len(changes.items)
+
+
+def sync_token_for(calendar: GoogleCalendar) -> Optional[str]:
+    """The token for a delta sync, or None when the calendar needs a full one."""
+    if calendar.synced_until is None:
+        return None
+    renew_at = calendar.synced_until - timedelta(days=CALENDAR_SYNC_HORIZON_DAYS - CALENDAR_SYNC_RESYNC_DAYS)
+    if datetime.now(timezone.utc) >= renew_at:
+        return None
+    return calendar.sync_token
+
+
+def is_stale(calendar: GoogleCalendar, max_age_seconds: float = CALENDAR_SYNC_INTERVAL_SECONDS) -> bool:
+    if calendar.synced_at is None or sync_token_for(calendar) is None:
+        return True
+    return datetime.now(timezone.utc) - calendar.synced_at >= timedelta(seconds=max_age_seconds)
+
+
+def busy_intervals(db: Session, user_id: int, start: datetime, end: datetime) -> List[Interval]:
+    """Read a user's merged busy intervals for a range from the local store."""
+    rows = db.query(CalendarEvent.start_time, CalendarEvent.end_time).join(GoogleCalendar).filter(
+        GoogleCalendar.user_id == user_id,
+        CalendarEvent.transparent.isnot(True),
+        CalendarEvent.start_time < end,
+        CalendarEvent.end_time > start
+    ).all()
+    return merge_intervals((to_minutes(event_start), to_minutes(event_end)) for event_start, event_end in rows)
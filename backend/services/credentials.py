@@ -0,0 +1,148 @@
+"""Live Google credentials for connected calendars.
+
+Credentials are built once per calendar and kept in memory, so a token that
+google-auth refreshes is reused by later requests instead of being thrown
+away. Refreshed tokens are written back to ``GoogleCalendar``, and a
+background task refreshes tokens shortly before they expire so request
+paths don't have to wait on Google's token endpoint.
+"""
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import google.auth.transport.requests
+import google.oauth2.credentials
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import GoogleCalendar
+
+CREDENTIAL_REFRESH_INTERVAL_SECONDS = float(os.getenv("CREDENTIAL_REFRESH_INTERVAL_SECONDS", "60"))
+CREDENTIAL_REFRESH_MARGIN_SECONDS = float(os.getenv("CREDENTIAL_REFRESH_MARGIN_SECONDS", "300"))
+CREDENTIAL_IDLE_SECONDS = float(os.getenv("CREDENTIAL_IDLE_SECONDS", "3600"))
+
+
+def to_google_expiry(value: Optional[datetime]) -> Optional[datetime]:
+    """google-auth expects expiry as a naive UTC datetime."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def from_google_expiry(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc)
+
+
+class CredentialManager:
+    def __init__(self, refresh_margin_seconds: float, idle_seconds: float):
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.idle_seconds = idle_seconds
+        self._credentials: Dict[int, google.oauth2.credentials.Credentials] = {}
+        self._persisted_tokens: Dict[int, str] = {}
+        self._last_used: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, calendar: GoogleCalendar) -> google.oauth2.credentials.Credentials:
+        """Return the live credentials for a calendar, building them on first use."""
+        with self._lock:
+            credentials = self._credentials.get(calendar.id)
+            if credentials is None or credentials.refresh_token != calendar.refresh_token:
+                credentials = google.oauth2.credentials.Credentials(
+                    token=calendar.access_token,
+                    refresh_token=calendar.refresh_token,
+                    token_uri=calendar.token_uri,
+                    client_id=calendar.client_id,
+                    client_secret=calendar.client_secret,
+                    scopes=calendar.scopes,
+                    expiry=to_google_expiry(calendar.token_expires_at)
+                )
+                self._credentials[calendar.id] = credentials
+                self._persisted_tokens[calendar.id] = calendar.access_token
+            self._last_used[calendar.id] = time.monotonic()
+            return credentials
+
+    def forget(self, calendar_id: int) -> None:
+        with self._lock:
+            self._credentials.pop(calendar_id, None)
+            self._persisted_tokens.pop(calendar_id, None)
+            self._last_used.pop(calendar_id, None)
+
+    def persist_refreshed(self, db: Session) -> int:
+        """Write tokens that were refreshed in memory back to their calendars.
+
+        Returns the number of calendars updated.
+        """
+        with self._lock:
+            refreshed = {
+                calendar_id: credentials
+                for calendar_id, credentials in self._credentials.items()
+                if credentials.token != self._persisted_tokens.get(calendar_id)
+            }
+        if not refreshed:
+            return 0
+
+        calendars = db.query(GoogleCalendar).filter(GoogleCalendar.id.in_(list(refreshed))).all()
+        for calendar in calendars:
+            credentials = refreshed[calendar.id]
+            calendar.access_token = credentials.token
+            calendar.token_expires_at = from_google_expiry(credentials.expiry)
+            calendar.updated_at = datetime.now(timezone.utc)
+        db.commit()
+
+        with self._lock:
+            for calendar_id, credentials in refreshed.items():
+                self._persisted_tokens[calendar_id] = credentials.token
+        return len(calendars)
+
+    def refresh_expiring(self) -> None:
+        """Refresh tokens that expire within the margin, then persist them.
+
+        Credentials that haven't been used for ``idle_seconds`` are dropped
+        instead, so idle calendars aren't kept warm forever.
+        """
+        now = time.monotonic()
+        deadline = datetime.utcnow() + timedelta(seconds=self.refresh_margin_seconds)
+        with self._lock:
+            for calendar_id in [
+                calendar_id for calendar_id, last_used in self._last_used.items()
+                if now - last_used > self.idle_seconds
+            ]:
+                self._credentials.pop(calendar_id, None)
+                self._persisted_tokens.pop(calendar_id, None)
+                self._last_used.pop(calendar_id, None)
+            expiring = {
+                calendar_id: credentials
+                for calendar_id, credentials in self._credentials.items()
+                if credentials.expiry is None or credentials.expiry <= deadline
+            }
+
+        request = google.auth.transport.requests.Request()
+        for calendar_id, credentials in expiring.items():
+            try:
+                credentials.refresh(request)
+            except Exception as e:
+                print(f"Error refreshing credentials for calendar {calendar_id}: {str(e)}")
+
+        db = SessionLocal()
+        try:
+            self.persist_refreshed(db)
+        finally:
+            db.close()
+
+    async def run_refresher(self, interval_seconds: float = CREDENTIAL_REFRESH_INTERVAL_SECONDS) -> None:
+        """Background loop for the app's startup hook."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await run_in_threadpool(self.refresh_expiring)
+            except Exception as e:
+                print(f"Error in credential refresher: {str(e)}")
+
+
+credential_manager = CredentialManager(CREDENTIAL_REFRESH_MARGIN_SECONDS, CREDENTIAL_IDLE_SECONDS)
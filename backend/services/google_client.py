@@ -0,0 +1,174 @@
+"""Pooled Google API service clients.
+
+Building a service with ``googleapiclient.discovery.build`` parses the
+discovery document and opens a fresh HTTP connection every time. This
+module keeps discovery documents cached on disk and in memory, and keeps
+idle, already-built services (each with its own keep-alive ``httplib2``
+connection) pooled per credential key so hot paths can reuse them.
+Services borrowed without a key are built fresh and never pooled, so one
+user's client is never handed to another.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator, List, NamedTuple, Tuple
+
+import google_auth_httplib2
+import googleapiclient.discovery
+import httplib2
+from googleapiclient import discovery_cache
+
+from services.metrics import record_google_call
+
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/{api}/{version}/rest"
+DISCOVERY_CACHE_DIR = os.getenv(
+    "GOOGLE_DISCOVERY_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".discovery_cache")
+)
+GOOGLE_HTTP_TIMEOUT_SECONDS = float(os.getenv("GOOGLE_HTTP_TIMEOUT_SECONDS", "10"))
+GOOGLE_CLIENT_POOL_MAX_KEYS = int(os.getenv("GOOGLE_CLIENT_POOL_MAX_KEYS", "256"))
+GOOGLE_CLIENT_POOL_MAX_IDLE = int(os.getenv("GOOGLE_CLIENT_POOL_MAX_IDLE", "4"))
+
+PoolKey = Tuple[str, str, Hashable]
+
+
+class PooledClient(NamedTuple):
+    service: object
+    # Kept alongside the service so credentials can be rebound without
+    # reaching into the service's private attributes
+    http: google_auth_httplib2.AuthorizedHttp
+
+
+class TimedHttp(httplib2.Http):
+    """An ``httplib2.Http`` that reports each request's status and duration."""
+
+    def __init__(self, api: str, **kwargs):
+        super().__init__(**kwargs)
+        self.api = api
+
+    def request(self, *args, **kwargs):
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response, content = super().request(*args, **kwargs)
+            status = str(response.status)
+            return response, content
+        finally:
+            record_google_call(self.api, status, time.perf_counter() - started)
+
+
+class GoogleClientPool:
+    def __init__(self, cache_dir: str, max_keys: int, max_idle_per_key: int):
+        self.cache_dir = cache_dir
+        self.max_keys = max_keys
+        self.max_idle_per_key = max_idle_per_key
+        self._documents: Dict[Tuple[str, str], str] = {}
+        self._idle: "OrderedDict[PoolKey, List]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def discovery_document(self, api: str, version: str) -> str:
+        """Return a discovery document from memory, then disk, then the library or network."""
+        document = self._documents.get((api, version))
+        if document is not None:
+            return document
+
+        path = os.path.join(self.cache_dir, f"{api}.{version}.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                document = f.read()
+        else:
+            document = discovery_cache.get_static_doc(api, version)
+            if document is None:
+                response, content = httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT_SECONDS).request(
+                    DISCOVERY_URL.format(api=api, version=version)
+                )
+                if response.status != 200:
+                    raise RuntimeError(f"Could not fetch discovery document for {api} {version}")
+                document = content.decode("utf-8")
+            json.loads(document)  # Never cache a corrupt document
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write then rename, so other workers never read a half-written file
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(document)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+        self._documents[(api, version)] = document
+        return document
+
+    def preload(self, *apis: Tuple[str, str]) -> None:
+        """Warm the discovery cache, e.g. at startup."""
+        for api, version in apis:
+            self.discovery_document(api, version)
+
+    def _build(self, api: str, version: str, credentials) -> PooledClient:
+        http = google_auth_httplib2.AuthorizedHttp(
+            credentials,
+            http=TimedHttp(api, timeout=GOOGLE_HTTP_TIMEOUT_SECONDS)
+        )
+        service = googleapiclient.discovery.build_from_document(
+            self.discovery_document(api, version),
+            http=http
+        )
+        return PooledClient(service, http)
+
+    @contextmanager
+    def service(self, api: str, version: str, credentials, key: Hashable = None) -> Iterator:
+        """Borrow a built service for ``key``, bound to ``credentials``.
+
+        ``key`` identifies whose credentials these are, e.g. a calendar id.
+        A service (and its HTTP connection) is only ever used by one thread
+        at a time; it goes back to the idle pool when the block exits.
+        Without a key the service is built for this call only.
+        """
+        if key is None:
+            yield self._build(api, version, credentials).service
+            return
+
+        pool_key = (api, version, key)
+        client = None
+        with self._lock:
+            idle = self._idle.get(pool_key)
+            if idle:
+                client = idle.pop()
+                self._idle.move_to_end(pool_key)
+        if client is None:
+            client = self._build(api, version, credentials)
+        else:
+            # Refreshed credentials are new objects, so rebind on every borrow
+            client.http.credentials = credentials
+
+        yield client.service
+        # Only reached on success; a client whose call raised is dropped
+        # rather than returned with a connection in an unknown state
+        self._release(pool_key, client)
+
+    def _release(self, pool_key: PoolKey, client: PooledClient) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(pool_key, [])
+            self._idle.move_to_end(pool_key)
+            if len(idle) < self.max_idle_per_key:
+                idle.append(client)
+            while len(self._idle) > self.max_keys:
+                self._idle.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        """Drop every pooled client for a credential key, e.g. when a calendar is disconnected."""
+        with self._lock:
+            for pool_key in [pool_key for pool_key in self._idle if pool_key[2] == key]:
+                del self._idle[pool_key]
+
+
+google_clients = GoogleClientPool(
+    DISCOVERY_CACHE_DIR,
+    GOOGLE_CLIENT_POOL_MAX_KEYS,
+    GOOGLE_CLIENT_POOL_MAX_IDLE
+)
@@ -0,0 +1,135 @@
+"""Durable background jobs on a Postgres table.
+
+Request handlers ``enqueue`` jobs in their own transaction, so a job exists
+exactly when the change that caused it committed. ``worker.py`` processes
+claim due jobs with ``FOR UPDATE SKIP LOCKED``, so any number of them can
+run side by side without handing out the same job twice. A failed job is
+retried with exponential backoff until ``max_attempts``. Delivery is
+at-least-once, so handlers use the job's idempotency key to make the
+external call safe to repeat.
+"""
+import os
+import random
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import Job
+
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+JOB_BATCH_SIZE = int(os.getenv("JOB_BATCH_SIZE", "10"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "8"))
+JOB_BACKOFF_BASE_SECONDS = float(os.getenv("JOB_BACKOFF_BASE_SECONDS", "5"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "3600"))
+# A running job whose worker died is handed out again after this long
+JOB_LOCK_TIMEOUT_SECONDS = float(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "300"))
+
+Handler = Callable[[Session, Job], None]
+handlers: Dict[str, Handler] = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying can't help; the job fails right away."""
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the function that runs jobs of ``kind``."""
+    def register(fn: Handler) -> Handler:
+        handlers[kind] = fn
+        return fn
+    return register
+
+
+async def enqueue(db: AsyncSession, kind: str, payload: dict, idempotency_key: str) -> None:
+    """Add a job to the caller's transaction. A job with the same key is left as is."""
+    await db.execute(insert(Job).values(
+        kind=kind,
+        payload=payload,
+        idempotency_key=idempotency_key,
+        status="queued",
+        attempts=0,
+        max_attempts=JOB_MAX_ATTEMPTS
+    ).on_conflict_do_nothing(index_elements=[Job.idempotency_key]))
+
+
+def backoff_seconds(attempts: int) -> float:
+    # Full jitter keeps retries of jobs that failed together from lining up
+    return random.uniform(0.5, 1.0) * min(JOB_BACKOFF_MAX_SECONDS, JOB_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def claim(db: Session, limit: int = JOB_BATCH_SIZE) -> List[Job]:
+    """Mark up to ``limit`` due jobs as running and return them."""
+    now = datetime.now(timezone.utc)
+    jobs = db.query(Job).filter(
+        Job.status == "queued",
+        Job.run_at <= now
+    ).order_by(Job.run_at).limit(limit).with_for_update(skip_locked=True).all()
+    for job in jobs:
+        job.status = "running"
+        job.locked_at = now
+        job.attempts += 1
+    db.commit()
+    return jobs
+
+
+def release_stale(db: Session) -> int:
+    """Requeue running jobs whose worker stopped before finishing them."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=JOB_LOCK_TIMEOUT_SECONDS)
+    count = db.query(Job).filter(Job.status == "running", Job.locked_at < cutoff).update(
+        {Job.status: "queued", Job.locked_at: None}, synchronize_session=False
+    )
+    db.commit()
+    return count
+
+
+def run_job(db: Session, job: Job) -> None:
+    """Run one claimed job and record the outcome."""
+    try:
+        fn = handlers.get(job.kind)
+        if fn is None:
+            raise PermanentJobError(f"No handler for job kind {job.kind!r}")
+        fn(db, job)
+    except Exception as e:
+        db.rollback()
+        job.last_error = "".join(traceback.format_exception_only(type(e), e)).strip()
+        if isinstance(e, PermanentJobError) or job.attempts >= job.max_attempts:
+            job.status = "failed"
+            print(f"Job {job.id} ({job.kind}) failed permanently: {job.last_error}")
+        else:
+            job.status = "queued"
+            job.run_at = datetime.now(timezone.utc) + timedelta(seconds=backoff_seconds(job.attempts))
+            print(f"Job {job.id} ({job.kind}) attempt {job.attempts} failed, retrying at {job.run_at}: {job.last_error}")
+    else:
+        job.status = "done"
+        job.last_error = None
+    job.locked_at = None
+    db.commit()
+
+
+def run_pending(db: Session, limit: int = JOB_BATCH_SIZE) -> int:
+    """Claim and run one batch of due jobs. Returns how many ran."""
+    jobs = claim(db, limit)
+    for job in jobs:
+        run_job(db, job)
+    return len(jobs)
+
+
+def run_worker(session_factory, poll_interval: float = JOB_POLL_INTERVAL_SECONDS) -> None:
+    """Process jobs until interrupted, sleeping only when the queue is empty."""
+    last_release = 0.0
+    while True:
+        db = session_factory()
+        try:
+            if time.monotonic() - last_release >= JOB_LOCK_TIMEOUT_SECONDS / 2:
+                release_stale(db)
+                last_release = time.monotonic()
+            ran = run_pending(db)
+        finally:
+            db.close()
+        if not ran:
+            time.sleep(poll_interval)
@@ -0,0 +1,256 @@
+"""Key-value stores with expiry, backed by Postgres tables, Redis or memory.
+
+``cache_store`` and ``session_store`` share one async interface:
+``get_many`` / ``set_many`` / ``delete_many`` (plus single-key helpers) with
+JSON values and an optional TTL. With ``KV_BACKEND=database`` they live in
+the ``cache`` and ``sessions`` tables; reads ignore and delete expired rows,
+and ``run_sweeper`` deletes the rest in bounded batches so the tables and
+their unique indexes stop growing. With ``KV_BACKEND=redis`` keys are
+namespaced in ``REDIS_URL`` and Redis expires them itself.
+
+``public_cache`` holds responses of the public booking endpoints. It is
+in-process by default; ``PUBLIC_CACHE_BACKEND=redis`` shares it between
+workers.
+"""
+import asyncio
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models import Cache, Session
+
+KV_BACKEND = os.getenv("KV_BACKEND", "database")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+KV_SWEEP_INTERVAL_SECONDS = float(os.getenv("KV_SWEEP_INTERVAL_SECONDS", "300"))
+KV_SWEEP_BATCH_SIZE = int(os.getenv("KV_SWEEP_BATCH_SIZE", "1000"))
+PUBLIC_CACHE_BACKEND = os.getenv("PUBLIC_CACHE_BACKEND", "memory")
+PUBLIC_CACHE_MAX_ENTRIES = int(os.getenv("PUBLIC_CACHE_MAX_ENTRIES", "10000"))
+
+
+def utcnow() -> datetime:
+    # expires_at columns are naive UTC, like their created_at defaults
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class KeyValueStore(ABC):
+    @abstractmethod
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Values for the keys that exist and haven't expired."""
+
+    @abstractmethod
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[float] = None, **columns) -> None:
+        """Store values, replacing existing ones. ``columns`` sets extra table columns, e.g. a session's user_id."""
+
+    @abstractmethod
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        """Remove the keys; missing ones are ignored."""
+
+    async def sweep(self, batch_size: int = KV_SWEEP_BATCH_SIZE) -> int:
+        """Delete expired entries. Returns how many were removed."""
+        return 0
+
+    async def get(self, key: str, default: Any = None) -> Any:
+        return (await self.get_many([key])).get(key, default)
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None, **columns) -> None:
+        await self.set_many({key: value}, ttl_seconds, **columns)
+
+    async def delete(self, key: str) -> None:
+        await self.delete_many([key])
+
+    def using(self, db: AsyncSession) -> "KeyValueStore":
+        """This store, on ``db``'s connection if it keeps its data in the database.
+
+        A request that already holds a pooled connection must not wait for a
+        second one. Writes through the returned store commit ``db``.
+        """
+        return self
+
+
+class DatabaseStore(KeyValueStore):
+    def __init__(self, model, key_column, value_column, session_factory=AsyncSessionLocal):
+        self.model = model
+        self.key_column = key_column
+        self.value_column = value_column
+        self.session_factory = session_factory
+
+    def using(self, db: AsyncSession) -> "DatabaseStore":
+        @asynccontextmanager
+        async def session():
+            # The caller owns db and closes it
+            yield db
+        return DatabaseStore(self.model, self.key_column, self.value_column, session_factory=session)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        now = utcnow()
+        async with self.session_factory() as db:
+            rows = (await db.execute(select(
+                self.key_column, self.value_column, self.model.expires_at
+            ).where(self.key_column.in_(keys)))).all()
+            expired = [key for key, value, expires_at in rows if expires_at is not None and expires_at <= now]
+            if expired:
+                # Lazy expiry; the sweeper gets the keys nobody reads again
+                await db.execute(delete(self.model).where(
+                    self.key_column.in_(expired),
+                    self.model.expires_at <= now
+                ))
+                await db.commit()
+        return {key: value for key, value, expires_at in rows if expires_at is None or expires_at > now}
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[float] = None, **columns) -> None:
+        if not items:
+            return
+        expires_at = utcnow() + timedelta(seconds=ttl_seconds) if ttl_seconds is not None else None
+        stmt = insert(self.model).values([
+            {self.key_column.key: key, self.value_column.key: value, "expires_at": expires_at, **columns}
+            for key, value in items.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.key_column],
+            set_={self.value_column.key: stmt.excluded[self.value_column.key], "expires_at": stmt.excluded.expires_at, **{
+                name: stmt.excluded[name] for name in columns
+            }}
+        )
+        async with self.session_factory() as db:
+            await db.execute(stmt)
+            await db.commit()
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        async with self.session_factory() as db:
+            await db.execute(delete(self.model).where(self.key_column.in_(keys)))
+            await db.commit()
+
+    async def sweep(self, batch_size: int = KV_SWEEP_BATCH_SIZE) -> int:
+        """Delete expired rows ``batch_size`` at a time, one short transaction each,
+        so the sweep never holds locks on a large part of the table."""
+        removed = 0
+        while True:
+            async with self.session_factory() as db:
+                batch = select(self.model.id).where(
+                    self.model.expires_at <= utcnow()
+                ).limit(batch_size).with_for_update(skip_locked=True).scalar_subquery()
+                result = await db.execute(delete(self.model).where(self.model.id.in_(batch)))
+                await db.commit()
+            removed += result.rowcount
+            if result.rowcount < batch_size:
+                return removed
+            # Let other work at the table between batches
+            await asyncio.sleep(0)
+
+
+class RedisStore(KeyValueStore):
+    def __init__(self, url: str, namespace: str, client=None):
+        if client is None:
+            import redis.asyncio as redis
+            client = redis.from_url(url)
+        self.redis = client
+        self.prefix = f"{namespace}:"
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = await self.redis.mget([self.prefix + key for key in keys])
+        return {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[float] = None, **columns) -> None:
+        # Extra columns only exist in the table layout
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(
+                    self.prefix + key,
+                    json.dumps(value),
+                    px=int(ttl_seconds * 1000) if ttl_seconds is not None else None
+                )
+            await pipe.execute()
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys:
+            await self.redis.delete(*(self.prefix + key for key in keys))
+
+
+class MemoryStore(KeyValueStore):
+    """A per-process LRU store. Values are kept as JSON so callers get a fresh
+    copy on every read, as they would from the other backends."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        now = time.monotonic()
+        found = {}
+        for key in keys:
+            entry = self._entries.get(key)
+            if entry is None:
+                continue
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= now:
+                del self._entries[key]
+                continue
+            self._entries.move_to_end(key)
+            found[key] = json.loads(value)
+        return found
+
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[float] = None, **columns) -> None:
+        expires_at = time.monotonic() + ttl_seconds if ttl_seconds is not None else None
+        for key, value in items.items():
+            self._entries[key] = (expires_at, json.dumps(value))
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def sweep(self, batch_size: int = KV_SWEEP_BATCH_SIZE) -> int:
+        now = time.monotonic()
+        expired = [key for key, (expires_at, _) in self._entries.items() if expires_at is not None and expires_at <= now]
+        for key in expired[:batch_size]:
+            del self._entries[key]
+        return min(len(expired), batch_size)
+
+
+def make_store(namespace: str, model, key_column, value_column) -> KeyValueStore:
+    if KV_BACKEND == "redis":
+        return RedisStore(REDIS_URL, namespace)
+    return DatabaseStore(model, key_column, value_column)
+
+
+cache_store = make_store("cache", Cache, Cache.key, Cache.value)
+session_store = make_store("session", Session, Session.token, Session.data)
+public_cache = (
+    RedisStore(REDIS_URL, "public") if PUBLIC_CACHE_BACKEND == "redis"
+    else MemoryStore(PUBLIC_CACHE_MAX_ENTRIES)
+)
+
+
+async def run_sweeper(interval_seconds: float = KV_SWEEP_INTERVAL_SECONDS) -> None:
+    """Periodically delete expired cache entries and sessions."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        for name, store in (("cache", cache_store), ("sessions", session_store), ("public cache", public_cache)):
+            try:
+                removed = await store.sweep()
+                if removed:
+                    print(f"Swept {removed} expired {name} entries")
+            except Exception as e:
+                print(f"Error sweeping expired {name} entries: {e}")
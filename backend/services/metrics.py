@@ -0,0 +1,232 @@
+"""Request-level performance metrics in the Prometheus text format.
+
+``MetricsMiddleware`` times every request and, through a context variable
+that follows the request onto the threadpool, counts the database queries
+and Google API calls it made and the time spent in each. The totals land in
+per-route histograms, so a slow route shows whether its time goes to the
+database, Google or our own code. ``watch_engine`` hooks an engine's cursor
+events and ``record_google_call`` is called by the Google HTTP client.
+``render()`` produces the ``/metrics`` page, including the pool counters
+from ``pool_metrics``.
+
+Metrics are per process: with several workers, each scrape sees the worker
+that served it, so scrape each worker's port or run one worker per target.
+"""
+import contextvars
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from services import pool_metrics
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, label_values)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # label values -> (count per bucket, sum, count)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = _labels(self.labels, label_values, f'le="{_number(float(bound))}"')
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                inf = _labels(self.labels, label_values, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{inf} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {_number(total)}")
+                lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {count}")
+        return lines
+
+
+request_seconds = Histogram(
+    "http_request_duration_seconds", "Time to serve a request, including a streamed body.",
+    LATENCY_BUCKETS, ("method", "route", "status")
+)
+request_db_queries = Histogram(
+    "http_request_db_queries", "Database queries made while serving a request.",
+    COUNT_BUCKETS, ("route",)
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Time spent in database queries while serving a request.",
+    LATENCY_BUCKETS, ("route",)
+)
+request_google_calls = Histogram(
+    "http_request_google_calls", "Google API calls made while serving a request.",
+    COUNT_BUCKETS, ("route",)
+)
+request_google_seconds = Histogram(
+    "http_request_google_seconds", "Time spent in Google API calls while serving a request.",
+    LATENCY_BUCKETS, ("route",)
+)
+db_query_seconds = Histogram(
+    "db_query_duration_seconds", "Duration of every database query, in or out of a request.",
+    LATENCY_BUCKETS, ("engine",)
+)
+google_call_seconds = Histogram(
+    "google_api_request_duration_seconds", "Duration of every Google API HTTP request.",
+    LATENCY_BUCKETS, ("api",)
+)
+google_calls = Counter(
+    "google_api_requests_total", "Google API HTTP requests by response status.",
+    ("api", "status")
+)
+
+_metrics = [
+    request_seconds, request_db_queries, request_db_seconds, request_google_calls,
+    request_google_seconds, db_query_seconds, google_call_seconds, google_calls,
+]
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    google_calls: int = 0
+    google_seconds: float = 0.0
+
+
+# Threadpool calls run in a copy of the request's context, so they update the
+# same RequestStats object; a lock keeps concurrent fan-out threads honest
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar("current_request", default=None)
+_stats_lock = threading.Lock()
+
+
+def watch_engine(engine: Engine, name: str) -> None:
+    """Time every query on ``engine`` (a sync Engine or ``async_engine.sync_engine``)."""
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        db_query_seconds.observe(elapsed, name)
+        stats = current_request.get()
+        if stats is not None:
+            with _stats_lock:
+                stats.db_queries += 1
+                stats.db_seconds += elapsed
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def record_google_call(api: str, status: str, elapsed: float) -> None:
+    google_calls.inc(api, status)
+    google_call_seconds.observe(elapsed, api)
+    stats = current_request.get()
+    if stats is not None:
+        with _stats_lock:
+            stats.google_calls += 1
+            stats.google_seconds += elapsed
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed bodies are timed to their last chunk."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_request.reset(token)
+            # The route template, not the path, keeps label sets bounded
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            request_seconds.observe(time.perf_counter() - started, scope["method"], route, str(status))
+            request_db_queries.observe(stats.db_queries, route)
+            request_db_seconds.observe(stats.db_seconds, route)
+            request_google_calls.observe(stats.google_calls, route)
+            request_google_seconds.observe(stats.google_seconds, route)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    pools = pool_metrics.snapshot()
+    stat_names = sorted({stat for stats in pools.values() for stat in stats})
+    for stat in stat_names:
+        name = f"db_pool_{stat}"
+        lines.append(f"# TYPE {name} gauge")
+        for pool, stats in sorted(pools.items()):
+            if stat in stats:
+                lines.append(f"{name}{_labels(('pool',), (pool,))} {_number(stats[stat])}")
+    return "\n".join(lines) + "\n"
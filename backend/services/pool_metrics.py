@@ -0,0 +1,90 @@
+"""Connection pool counters collected from SQLAlchemy pool events.
+
+``watch(engine, name)`` attaches listeners to an engine's pool and
+``snapshot()`` returns the counters for every watched pool, alongside the
+pool's own size / checked-out / overflow numbers, for sizing the pool
+against real load.
+"""
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class PoolMetrics:
+    def __init__(self, name: str, pool):
+        self.name = name
+        self.pool = pool
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.held_seconds = 0.0
+        self.max_held_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        # record_info survives the record reconnecting after an invalidate
+        connection_record.record_info["checked_out_at"] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        checked_out_at = connection_record.record_info.pop("checked_out_at", None)
+        held = time.perf_counter() - checked_out_at if checked_out_at is not None else 0.0
+        with self._lock:
+            self.checkins += 1
+            self.in_use -= 1
+            self.held_seconds += held
+            self.max_held_seconds = max(self.max_held_seconds, held)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            stats = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "avg_held_ms": round(self.held_seconds / self.checkins * 1000, 2) if self.checkins else 0.0,
+                "max_held_ms": round(self.max_held_seconds * 1000, 2),
+            }
+        # NullPool (transaction pooling mode) has no size or overflow
+        for attr in ("size", "checkedout", "overflow"):
+            method = getattr(self.pool, attr, None)
+            if method is not None:
+                stats[attr] = method()
+        return stats
+
+
+_pools: Dict[str, PoolMetrics] = {}
+
+
+def watch(engine: Engine, name: str) -> PoolMetrics:
+    """Collect checkout metrics for ``engine`` (a sync Engine or ``async_engine.sync_engine``)."""
+    metrics = PoolMetrics(name, engine.pool)
+    event.listen(engine.pool, "connect", metrics.on_connect)
+    event.listen(engine.pool, "checkout", metrics.on_checkout)
+    event.listen(engine.pool, "checkin", metrics.on_checkin)
+    event.listen(engine.pool, "invalidate", metrics.on_invalidate)
+    _pools[name] = metrics
+    return metrics
+
+
+def snapshot() -> Dict[str, Dict]:
+    return {name: metrics.snapshot() for name, metrics in _pools.items()}
@@ -0,0 +1,229 @@
+"""On-demand request profiling and an always-on sampling profiler.
+
+A request carrying ``X-Profile: <PROFILING_TOKEN>`` is run under cProfile
+and answered with the profile report instead of its body (the original
+status is in ``X-Profile-Status``); the raw stats are saved under
+``PROFILE_DIR`` for snakeviz or ``pstats``. cProfile only sees the thread
+it runs in, so threadpool work joins the request's profile through
+``thread_profile()`` and ``profile_iterator()``. The event loop part also
+records whatever else the loop ran meanwhile, so profile on a quiet worker.
+
+``StackSampler`` snapshots every busy thread's stack ``PROFILE_SAMPLE_HZ``
+times a second and appends the counts to ``PROFILE_DIR/samples-<pid>.folded``
+in the collapsed format that flamegraph.pl and speedscope read.
+"""
+import contextvars
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN")
+PROFILE_HEADER = "x-profile"
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles")
+)
+PROFILE_REPORT_LINES = int(os.getenv("PROFILE_REPORT_LINES", "60"))
+PROFILE_SAMPLE_HZ = float(os.getenv("PROFILE_SAMPLE_HZ", "5"))
+PROFILE_SAMPLE_FLUSH_SECONDS = float(os.getenv("PROFILE_SAMPLE_FLUSH_SECONDS", "60"))
+PROFILE_SAMPLE_MAX_BYTES = int(os.getenv("PROFILE_SAMPLE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+# Leaf functions of a thread that is parked rather than working
+IDLE_FUNCTIONS = {"wait", "select", "poll", "_worker"}
+
+
+class RequestProfile:
+    def __init__(self):
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """Profile the current thread for the duration of the block."""
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self.profiles.append(profile)
+
+    def stats(self) -> pstats.Stats:
+        with self._lock:
+            stats = pstats.Stats(self.profiles[0])
+            for profile in self.profiles[1:]:
+                stats.add(profile)
+        return stats
+
+
+current_profile: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar("current_profile", default=None)
+
+
+@contextmanager
+def thread_profile() -> Iterator[None]:
+    """Add the block to the current request's profile, if it is being profiled."""
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    with profile.thread():
+        yield
+
+
+def profile_iterator(iterator: Iterator) -> Iterator:
+    """Profile each step of an iterator, which may run on a different thread every time."""
+    try:
+        while True:
+            with thread_profile():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        # Run the wrapped generator's cleanup if the consumer stops early
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def authorized(token: Optional[str]) -> bool:
+    return bool(PROFILING_TOKEN) and token is not None and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware answering profiled requests with their report."""
+
+    def __init__(self, app):
+        self.app = app
+        # One profiled request at a time: a thread holds one cProfile at once
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = dict(scope["headers"]).get(PROFILE_HEADER.encode())
+        if token is None or not authorized(token.decode("latin-1")) or not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            profile = RequestProfile()
+            context_token = current_profile.set(profile)
+            status = 500
+
+            async def discard_body(message):
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+
+            started = time.perf_counter()
+            try:
+                with profile.thread():
+                    await self.app(scope, receive, discard_body)
+            finally:
+                current_profile.reset(context_token)
+            elapsed = time.perf_counter() - started
+        finally:
+            self._busy.release()
+
+        report, path = self.report(scope, profile, elapsed)
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"cache-control", b"no-store"),
+                (b"x-profile-status", str(status).encode()),
+                (b"x-profile-file", os.path.basename(path).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": report.encode()})
+
+    def report(self, scope, profile: RequestProfile, elapsed: float):
+        stats = profile.stats()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"request-{int(time.time() * 1000)}-{os.getpid()}.prof")
+        stats.dump_stats(path)
+
+        out = io.StringIO()
+        out.write(f"{scope['method']} {scope['path']} took {elapsed * 1000:.1f} ms across {len(profile.profiles)} thread slices\n\n")
+        stats.stream = out
+        stats.sort_stats("cumulative").print_stats(PROFILE_REPORT_LINES)
+        return out.getvalue(), path
+
+
+class StackSampler:
+    def __init__(self, hz: float, flush_seconds: float, directory: str, max_bytes: int):
+        self.interval = 1.0 / hz
+        self.flush_seconds = flush_seconds
+        self.path = os.path.join(directory, f"samples-{os.getpid()}.folded")
+        self.max_bytes = max_bytes
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._thread = threading.Thread(target=self.run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for ident, frame in sys._current_frames().items():
+            if ident == own or frame.f_code.co_name in IDLE_FUNCTIONS:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.samples[";".join(reversed(stack))] += 1
+
+    def flush(self) -> None:
+        if not self.samples:
+            return
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+            os.replace(self.path, self.path + ".1")
+        with open(self.path, "a") as f:
+            for stack, count in self.samples.items():
+                f.write(f"{stack} {count}\n")
+        self.samples.clear()
+
+    def run(self) -> None:
+        next_flush = time.monotonic() + self.flush_seconds
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+                if time.monotonic() >= next_flush:
+                    self.flush()
+                    next_flush = time.monotonic() + self.flush_seconds
+            except Exception as e:
+                print(f"Error in stack sampler: {e}")
+        self.flush()
+
+
+def start_sampler() -> Optional[StackSampler]:
+    """Start the sampling profiler unless PROFILE_SAMPLE_HZ is 0."""
+    if PROFILE_SAMPLE_HZ <= 0:
+        return None
+    sampler = StackSampler(PROFILE_SAMPLE_HZ, PROFILE_SAMPLE_FLUSH_SECONDS, PROFILE_DIR, PROFILE_SAMPLE_MAX_BYTES)
+    sampler.start()
+    return sampler
@@ -0,0 +1,167 @@
+"""Post-booking side effects, run as background jobs.
+
+``book_meeting`` enqueues one job of each kind in the booking transaction,
+leaving out the calendar event when no connected account granted the
+scope to create one.
+The handlers talk to the outside world through ``clients``, which tests and
+benchmarks can swap for local fakes (see ``benchmarks/fake_services.py``).
+Each external call is keyed by the job's idempotency key so a retry after a
+lost response doesn't create a second event, email or contact.
+"""
+import hashlib
+import os
+import smtplib
+from dataclasses import dataclass
+from datetime import timezone
+from email.message import EmailMessage
+from typing import Any, List
+
+import httpx
+from googleapiclient.errors import HttpError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import GoogleCalendar, Job, Meeting, SchedulingLink, User
+from services.credentials import credential_manager
+from services.google_client import google_clients
+from services.jobs import PermanentJobError, enqueue, handler
+
+CREATE_CALENDAR_EVENT = "create_calendar_event"
+SEND_CONFIRMATION_EMAIL = "send_confirmation_email"
+CREATE_HUBSPOT_CONTACT = "create_hubspot_contact"
+
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USERNAME = os.getenv("SMTP_USERNAME")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+EMAIL_FROM = os.getenv("EMAIL_FROM", "no-reply@localhost")
+HUBSPOT_ACCESS_TOKEN = os.getenv("HUBSPOT_ACCESS_TOKEN")
+HUBSPOT_API_URL = os.getenv("HUBSPOT_API_URL", "https://api.hubapi.com")
+EXTERNAL_TIMEOUT_SECONDS = float(os.getenv("EXTERNAL_TIMEOUT_SECONDS", "10"))
+
+
+async def enqueue_booking_side_effects(db: AsyncSession, meeting_id: int, user_id: int) -> None:
+    kinds = [SEND_CONFIRMATION_EMAIL, CREATE_HUBSPOT_CONTACT]
+    calendars = (await db.scalars(select(GoogleCalendar).where(GoogleCalendar.user_id == user_id))).all()
+    # Without the write scope every attempt would get a 403, so don't queue one
+    if any(not calendar.needs_reconsent for calendar in calendars):
+        kinds.insert(0, CREATE_CALENDAR_EVENT)
+    elif calendars:
+        print(f"User {user_id}'s calendars need re-consent, not creating an event for meeting {meeting_id}")
+    for kind in kinds:
+        await enqueue(db, kind, {"meeting_id": meeting_id}, f"{kind}:{meeting_id}")
+
+
+class GoogleCalendarEvents:
+    def insert(self, calendar: GoogleCalendar, event: dict) -> None:
+        """Create an event; one that already exists with the same id counts as created."""
+        try:
+            with google_clients.service('calendar', 'v3', credential_manager.get(calendar), key=calendar.id) as service:
+                service.events().insert(calendarId='primary', body=event, sendUpdates='all').execute()
+        except HttpError as e:
+            if e.resp.status != 409:
+                raise
+
+
+class SmtpMailer:
+    def send(self, message: EmailMessage) -> None:
+        if not SMTP_HOST:
+            print(f"SMTP_HOST not set, not sending: {message['Subject']} to {message['To']}")
+            return
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=EXTERNAL_TIMEOUT_SECONDS) as smtp:
+            smtp.starttls()
+            if SMTP_USERNAME:
+                smtp.login(SMTP_USERNAME, SMTP_PASSWORD)
+            smtp.send_message(message)
+
+
+class HubSpotContacts:
+    def create(self, properties: dict) -> None:
+        """Create a contact; one that already exists for the email counts as created."""
+        if not HUBSPOT_ACCESS_TOKEN:
+            print(f"HUBSPOT_ACCESS_TOKEN not set, not creating contact {properties['email']}")
+            return
+        response = httpx.post(
+            f"{HUBSPOT_API_URL}/crm/v3/objects/contacts",
+            json={"properties": properties},
+            headers={"Authorization": f"Bearer {HUBSPOT_ACCESS_TOKEN}"},
+            timeout=EXTERNAL_TIMEOUT_SECONDS
+        )
+        if response.status_code == 409:
+            return
+        if 400 <= response.status_code < 500 and response.status_code != 429:
+            raise PermanentJobError(f"HubSpot rejected contact: {response.status_code} {response.text}")
+        response.raise_for_status()
+
+
+@dataclass
+class Clients:
+    calendar: Any
+    mailer: Any
+    crm: Any
+
+
+clients = Clients(calendar=GoogleCalendarEvents(), mailer=SmtpMailer(), crm=HubSpotContacts())
+
+
+def load_meeting(db: Session, job: Job) -> Meeting:
+    meeting = db.get(Meeting, job.payload["meeting_id"])
+    if meeting is None:
+        raise PermanentJobError(f"Meeting {job.payload['meeting_id']} no longer exists")
+    return meeting
+
+
+def event_id(idempotency_key: str) -> str:
+    # Google event ids only allow base32hex characters; hex digits qualify
+    return hashlib.sha1(idempotency_key.encode()).hexdigest()
+
+
+@handler(CREATE_CALENDAR_EVENT)
+def create_calendar_event(db: Session, job: Job) -> None:
+    meeting = load_meeting(db, job)
+    calendars = db.query(GoogleCalendar).filter(GoogleCalendar.user_id == meeting.user_id).order_by(GoogleCalendar.id).all()
+    if not calendars:
+        print(f"User {meeting.user_id} has no connected calendar, skipping event for meeting {meeting.id}")
+        return
+    # Reconnecting adds a new row, so skip older ones that lack the write scope
+    calendar = next((calendar for calendar in calendars if not calendar.needs_reconsent), None)
+    if calendar is None:
+        raise PermanentJobError(f"User {meeting.user_id}'s calendars need re-consent to create events")
+    link = db.get(SchedulingLink, meeting.scheduling_link_id)
+    clients.calendar.insert(calendar, {
+        "id": event_id(job.idempotency_key),
+        "summary": link.title if link else "Meeting",
+        "start": {"dateTime": meeting.meeting_time.astimezone(timezone.utc).isoformat()},
+        "end": {"dateTime": meeting.end_time.astimezone(timezone.utc).isoformat()},
+        "attendees": [{"email": meeting.email}],
+        "description": f"LinkedIn: {meeting.linkedin_url}" if meeting.linkedin_url else None,
+    })
+
+
+@handler(SEND_CONFIRMATION_EMAIL)
+def send_confirmation_email(db: Session, job: Job) -> None:
+    meeting = load_meeting(db, job)
+    link = db.get(SchedulingLink, meeting.scheduling_link_id)
+    advisor = db.get(User, meeting.user_id)
+    recipients: List[str] = [meeting.email] + ([advisor.email] if advisor and advisor.email else [])
+
+    message = EmailMessage()
+    message["From"] = EMAIL_FROM
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = f"Confirmed: {link.title if link else 'Meeting'}"
+    # A stable Message-ID lets mail servers drop the duplicate if a retry resends it
+    message["Message-ID"] = f"<{event_id(job.idempotency_key)}@scheduler>"
+    message.set_content(
+        f"Your meeting is booked for {meeting.meeting_time.astimezone(timezone.utc):%Y-%m-%d %H:%M} UTC."
+    )
+    clients.mailer.send(message)
+
+
+@handler(CREATE_HUBSPOT_CONTACT)
+def create_hubspot_contact(db: Session, job: Job) -> None:
+    meeting = load_meeting(db, job)
+    properties = {"email": meeting.email}
+    if meeting.linkedin_url:
+        properties["website"] = meeting.linkedin_url
+    clients.crm.create(properties)
@@ -0,0 +1,66 @@
+"""Short-lived in-process cache of authenticated users.
+
+``get_current_user`` runs on every authenticated request; caching the
+user's column values by id saves the lookup query. Entries expire after a
+short TTL and are dropped as soon as this process updates or deletes the
+user through the ORM, so other workers see a change within the TTL.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect
+
+from models import User
+
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_ENTRIES = int(os.getenv("USER_CACHE_MAX_ENTRIES", "10000"))
+
+
+class UserCache:
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[User]:
+        """Return a transient copy of the cached user, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, values = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        # A fresh object per request, so no session ever shares it
+        return User(**values)
+
+    def set(self, user: User) -> None:
+        values = {column.key: getattr(user, column.key) for column in inspect(User).column_attrs}
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, values)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache(USER_CACHE_TTL_SECONDS, USER_CACHE_MAX_ENTRIES)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    user_cache.invalidate(target.id)
@@ -0,0 +1,131 @@
+"""Precompiled weekly availability templates.
+
+A user's ``SchedulingWindow`` rows are compiled once into a flat
+``array('i')`` of merged minute-of-week intervals ``[s0, e0, s1, e1, ...]``
+(Monday 00:00 is minute 0). Slot generation expands the template over any
+range with integer arithmetic instead of re-parsing "HH:MM" strings per day.
+Templates are rebuilt when the scheduling_windows router changes a window,
+and every other worker picks the change up through a version token in the
+shared ``cache_store``.
+"""
+import os
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import SchedulingWindow
+from services.availability import MINUTES_PER_DAY, Interval, merge_intervals, parse_hhmm
+from services.kv_store import KeyValueStore, cache_store
+
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+# 1970-01-01 was a Thursday, so epoch minute 0 falls 3 days into its week
+EPOCH_WEEK_OFFSET = 3 * MINUTES_PER_DAY
+# How stale another worker's window change can be here
+WEEKLY_TEMPLATE_CHECK_SECONDS = float(os.getenv("WEEKLY_TEMPLATE_CHECK_SECONDS", "5"))
+
+
+def compile_template(windows: Iterable[Tuple[int, str, str]]) -> array:
+    """Compile (day_of_week, "HH:MM", "HH:MM") windows into a flat interval array."""
+    intervals = merge_intervals(
+        (day_of_week * MINUTES_PER_DAY + parse_hhmm(start_hour), day_of_week * MINUTES_PER_DAY + parse_hhmm(end_hour))
+        for day_of_week, start_hour, end_hour in windows
+    )
+    return array("i", [minute for interval in intervals for minute in interval])
+
+
+def expand_template(template: array, start: int, end: int) -> List[Interval]:
+    """Expand a template (in UTC) over ``[start, end)`` in epoch minutes.
+
+    Windows that overlap the range are returned whole, as clipping one would
+    move its slot grid; trim the resulting slots with ``slots_between``.
+    """
+    intervals: List[Interval] = []
+    week_start = start - (start + EPOCH_WEEK_OFFSET) % MINUTES_PER_WEEK
+    while week_start < end:
+        for i in range(0, len(template), 2):
+            window_start = week_start + template[i]
+            window_end = week_start + template[i + 1]
+            if window_end <= start:
+                continue
+            if window_start >= end:
+                break
+            intervals.append((window_start, window_end))
+        week_start += MINUTES_PER_WEEK
+    # Joins a window ending at Sunday midnight with one starting Monday 00:00
+    return merge_intervals(intervals)
+
+
+class CachedTemplate(NamedTuple):
+    template: array
+    version: str
+    checked_at: float
+
+
+class WeeklyTemplateCache:
+    """Compiled templates per user, kept in step across workers.
+
+    Each user's windows have a version token in ``store``, which all workers
+    share; it is read on the caller's session. ``rebuild`` replaces it after a write; ``get`` compares it with the
+    local copy at most every ``check_seconds`` and recompiles when it moved.
+    """
+
+    def __init__(self, store: KeyValueStore, check_seconds: float):
+        self.store = store
+        self.check_seconds = check_seconds
+        self._entries: Dict[int, CachedTemplate] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"windows-version:{user_id}"
+
+    async def get(self, db: AsyncSession, user_id: int) -> array:
+        """Return a user's template, compiling it on first use or when another worker changed it."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is not None and now - entry.checked_at < self.check_seconds:
+            return entry.template
+
+        store = self.store.using(db)
+        version = await store.get(self._key(user_id))
+        if entry is not None and version == entry.version:
+            with self._lock:
+                self._entries[user_id] = entry._replace(checked_at=now)
+            return entry.template
+        if version is None:
+            # Never written, or evicted; start a new version every worker will adopt
+            version = os.urandom(8).hex()
+            await store.set(self._key(user_id), version)
+        return await self._load(db, user_id, version)
+
+    async def rebuild(self, db: AsyncSession, user_id: int) -> array:
+        """Recompile a user's template after their windows changed, and tell the other workers."""
+        version = os.urandom(8).hex()
+        template = await self._load(db, user_id, version)
+        await self.store.using(db).set(self._key(user_id), version)
+        return template
+
+    async def _load(self, db: AsyncSession, user_id: int, version: str) -> array:
+        windows = (await db.execute(select(
+            SchedulingWindow.day_of_week,
+            SchedulingWindow.start_hour,
+            SchedulingWindow.end_hour
+        ).where(SchedulingWindow.user_id == user_id))).all()
+        template = compile_template(windows)
+        with self._lock:
+            self._entries[user_id] = CachedTemplate(template, version, time.monotonic())
+        return template
+
+    def version(self, user_id: int) -> Optional[str]:
+        """The shared version of the template ``get`` last returned; the same in every worker."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+        return entry.version if entry is not None else None
+
+
+weekly_templates = WeeklyTemplateCache(cache_store, WEEKLY_TEMPLATE_CHECK_SECONDS)
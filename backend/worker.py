@@ -0,0 +1,16 @@
+"""Background job worker.
+
+Run one or more alongside the API server:
+
+    python worker.py
+"""
+from database import SessionLocal
+from services import side_effects  # Registers the job handlers
+from services.jobs import run_worker
+
+if __name__ == "__main__":
+    print("Starting job worker...")
+    try:
+        run_worker(SessionLocal)
+    except KeyboardInterrupt:
+        print("Job worker stopped")